@@ -2,6 +2,7 @@
 Configuration settings for WhatsApp Automation
 """
 import os
+import functools
 from pathlib import Path
 
 # Project paths
@@ -10,43 +11,88 @@ IMAGES_DIR = PROJECT_ROOT / "images"
 LOGS_DIR = PROJECT_ROOT / "logs"
 MESSAGES_DIR = PROJECT_ROOT / "messages"
 
-# Create directories if they don't exist
-IMAGES_DIR.mkdir(exist_ok=True)
-LOGS_DIR.mkdir(exist_ok=True)
-MESSAGES_DIR.mkdir(exist_ok=True)
-
 # WhatsApp Web settings
 WHATSAPP_WEB_URL = "https://web.whatsapp.com"
-IMPLICIT_WAIT = 15
+IMPLICIT_WAIT = 15  # seconds for explicit waits (the driver's implicit wait is kept at 0)
 PAGE_LOAD_TIMEOUT = 60
 QR_SCAN_TIMEOUT = 120
+UI_WAIT_TIMEOUT = 10  # seconds to wait for a chat/page element to become ready
+UI_POLL_INTERVAL = 0.1  # seconds between checks while waiting
 
 # Message settings
 DEFAULT_MESSAGE_FILE = MESSAGES_DIR / "message.txt"
 MIN_DELAY_BETWEEN_MESSAGES = 10  # seconds
 MAX_DELAY_BETWEEN_MESSAGES = 30  # seconds
+MAX_CONCURRENT_SENDS = 1  # Browser sessions sending in parallel (each needs its own login)
+# Session pool: restart a session's browser after this many sends, releasing the memory a
+# long-running WhatsApp Web tab builds up (0 to never; only with CHROME_PROFILE_PATH set,
+# as without a profile logging in again needs a new QR code scan)
+MAX_SENDS_PER_SESSION = 500
+SEND_DELAY_SEED = None  # Set an int to get the same sequence of delays on every run (for replay/debugging)
+MAX_SEND_BACKOFF = 8  # After failed sends, delays grow up to this many times the range above
+SEND_RETRIES = 2  # Extra attempts for a send that failed for a possibly temporary reason
+RETRY_BASE_DELAY = 5  # seconds before the first retry; doubles for each further one
+RETRY_MAX_DELAY = 60  # seconds, upper bound for the pause before a retry
+# Results so far are written to PROGRESS_FILE after every this many contacts (and at the end)
+PROGRESS_CHECKPOINT_INTERVAL = 100
+POPUP_RECHECK_INTERVAL = 50  # Re-check for popups after every this many sent messages
+# Set to a file path to remember sent numbers across runs, so a restarted campaign skips
+# contacts that already got the message (None: duplicates are only tracked within a run)
+SENT_NUMBERS_FILE = None
 
 # OCR settings
-TESSERACT_CONFIG = '--oem 3 --psm 6'
+# LSTM engine only, single uniform block of text (the participant list); screenshots
+# are binarized to dark-on-light, so Tesseract's inverted-text retries are switched off
+TESSERACT_CONFIG = '--oem 1 --psm 6 -c tessedit_do_invert=0'
 SUPPORTED_IMAGE_FORMATS = ['.png', '.jpg', '.jpeg', '.tiff', '.bmp']
+# Region of screenshots passed to OCR, as fractions of width/height (left, top, right, bottom).
+# The default drops the avatar column; lower 'bottom' to also cut off a navigation bar
+OCR_CROP = (0.15, 0.0, 1.0, 1.0)
+# Wider (cropped) screenshots are scaled down to this width before OCR
+OCR_MAX_WIDTH = 1200
+# Blur/threshold screenshots on the GPU when OpenCV has CUDA support and a device is present
+OCR_USE_GPU = False
+# Parallel Tesseract processes for multi-image OCR; Tesseract scales to about 4 cores
+# per process, or set OMP_THREAD_LIMIT=1 and raise this to the core count
+OCR_WORKERS = max(1, (os.cpu_count() or 1) // 4)
 
 # Phone number settings
 DEFAULT_COUNTRY_CODE = "US"
 PHONE_VALIDATION_ENABLED = True
+VALIDATION_WORKERS = os.cpu_count() or 1  # Processes used for large contact lists
+PARALLEL_VALIDATION_THRESHOLD = 10000  # Validate serially below this many contacts
 
 # Logging settings
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 MAX_LOG_SIZE = 10 * 1024 * 1024  # 10MB
 BACKUP_COUNT = 5
+PROGRESS_FILE = LOGS_DIR / "send_progress.json"  # Send results of the current/last run
+SEND_LOG_FILE = LOGS_DIR / "send_results.jsonl"  # One JSON line per send outcome (None to disable)
 
 # Browser settings
 HEADLESS_MODE = False  # Set to True to run in background
 CHROME_PROFILE_PATH = None  # Set path to use existing Chrome profile
+# Attach to a Chrome started with --remote-debugging-port (e.g. "127.0.0.1:9222") instead of
+# launching one; a browser that stays logged in skips startup and login on every run.
+# The session pool ignores it: WhatsApp Web only runs in one tab per browser
+CHROME_DEBUGGER_ADDRESS = None
 DOWNLOAD_PATH = PROJECT_ROOT / "downloads"
+# Requests the browser never makes: WhatsApp media CDN, emoji sprites and video/webp previews
+BLOCKED_URL_PATTERNS = [
+    "*.whatsapp.net/*.jpg",
+    "*.whatsapp.net/*.jpeg",
+    "*pps.whatsapp.net/*",
+    "*/emoji/*",
+    "*.mp4",
+    "*.webp",
+]
 
-# Create downloads directory
-DOWNLOAD_PATH.mkdir(exist_ok=True)
+@functools.lru_cache(maxsize=None)
+def ensure_dirs():
+    """Create project directories if they don't exist (only on first call)"""
+    for directory in (IMAGES_DIR, LOGS_DIR, MESSAGES_DIR, DOWNLOAD_PATH):
+        directory.mkdir(exist_ok=True)
 
 # User settings (from environment or defaults)
 YOUR_PHONE_NUMBER = os.getenv("YOUR_PHONE_NUMBER", "+1 9493102808") 
\ No newline at end of file
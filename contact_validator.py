@@ -4,19 +4,194 @@ Validates and formats phone numbers and contact information
 """
 import re
 import logging
-from typing import List, Dict, Optional, Tuple
-import phonenumbers
-from phonenumbers import carrier, geocoder, NumberParseException
+import functools
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple, FrozenSet, Iterable, Iterator, NamedTuple, Sized
+from phonenumbers import NumberParseException, PhoneNumber, PhoneNumberFormat, PhoneNumberMatcher
+from phonenumbers import parse as _pn_parse
+from phonenumbers import is_possible_number as _pn_possible
+from phonenumbers import is_valid_number as _pn_valid
+from phonenumbers import format_number as _pn_format
+from phonenumbers import number_type as _pn_number_type
+from phonenumbers.carrier import name_for_number as _pn_carrier_name
+from phonenumbers.geocoder import description_for_number as _pn_location
 import config
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+_E164 = PhoneNumberFormat.E164
+
+# Precompiled patterns used on every contact
+_NAME_VALID_RE = re.compile(r"^[a-zA-Z\s.\-']+$")
+
+class _PhoneCharTable(dict):
+    """
+    str.translate table keeping decimal digits and '+', dropping everything else
+    
+    Entries are filled in on first sight of each character, so the table matches
+    the regex class [^\\d+] (including non-ASCII digits) without enumerating Unicode.
+    """
+    
+    def __missing__(self, code: int) -> Optional[str]:
+        char = chr(code)
+        value = char if char.isdecimal() or char == '+' else None
+        self[code] = value
+        return value
+
+_PHONE_KEEP = _PhoneCharTable()
+
+# Phone metadata that can be attached to validated contacts. Only the country
+# code is cheap; the rest load large phonenumbers tables and are opt-in.
+METADATA_FIELDS = ('carrier', 'location', 'country_code', 'number_type')
+DEFAULT_METADATA_FIELDS = frozenset({'country_code'})
+
+# E.164 numbers carry between 7 and 15 digits (country code included)
+MIN_PHONE_DIGITS = 7
+MAX_PHONE_DIGITS = 15
+
+# Phone helpers are pure functions of their arguments, so they are cached at
+# module level; address books often repeat the same numbers across contacts.
+_PHONE_CACHE_SIZE = 100_000
+
+def _clean_phone_number(phone: str) -> str:
+    """Clean phone number by removing unnecessary characters"""
+    # Remove all non-digit and non-plus characters
+    cleaned = phone.translate(_PHONE_KEEP)
+    
+    # Handle common US formats
+    if len(cleaned) == 10 and not cleaned.startswith('+'):
+        # Assume US number
+        cleaned = '+1' + cleaned
+    elif len(cleaned) == 11 and cleaned.startswith('1') and not cleaned.startswith('+'):
+        # US number with country code but no plus
+        cleaned = '+' + cleaned
+    
+    return cleaned
+
+@functools.lru_cache(maxsize=_PHONE_CACHE_SIZE)
+def _parse_once(phone: str, default_country: str) -> Optional[Tuple[PhoneNumber, str]]:
+    """
+    Parse a raw phone number once for all validation stages
+    
+    Returns:
+        Tuple of (parsed PhoneNumber, E.164 string) or None if invalid.
+        The cached PhoneNumber is shared between callers and must not be mutated.
+    """
+    try:
+        # Clean the phone number
+        cleaned_phone = _clean_phone_number(phone)
+        
+        # Reject obvious junk before running the full phonenumbers parser
+        digit_count = len(cleaned_phone) - cleaned_phone.count('+')
+        if not MIN_PHONE_DIGITS <= digit_count <= MAX_PHONE_DIGITS:
+            return None
+        
+        # Try to parse the phone number
+        try:
+            # First try with default country
+            parsed_number = _pn_parse(cleaned_phone, default_country)
+        except NumberParseException:
+            # If that fails, try as international number
+            if not cleaned_phone.startswith('+'):
+                cleaned_phone = '+' + cleaned_phone
+            parsed_number = _pn_parse(cleaned_phone, None)
+        
+        # Cheap length-only check first; is_valid_number runs the per-region
+        # number pattern regexes and only needs to see plausible numbers
+        if not _pn_possible(parsed_number):
+            return None
+        
+        # Check if the number is valid
+        if not _pn_valid(parsed_number):
+            return None
+        
+        # Format as international number
+        formatted = _pn_format(parsed_number, _E164)
+        return parsed_number, formatted
+        
+    except Exception as e:
+        logger.debug("Could not format phone number '%s': %s", phone, e)
+        return None
+
+def _is_phone_number_valid(parsed_number: PhoneNumber) -> bool:
+    """
+    Additional validation for phone numbers
+    
+    Numbers reach this only through _parse_once, which already checked
+    is_possible_number and is_valid_number, so neither is repeated here.
+    """
+    # Additional checks can be added here
+    # For example, check against blocked country codes, etc.
+    return True
+
+def _get_phone_metadata(parsed_number: PhoneNumber, fields: FrozenSet[str] = DEFAULT_METADATA_FIELDS) -> Optional[Tuple[Tuple[str, str], ...]]:
+    """
+    Get metadata about the phone number
+    
+    Only the requested fields are looked up: carrier, location and number type
+    each load large phonenumbers data tables, so callers must opt in to them.
+    Returns (key, value) pairs; callers convert to a dict as needed.
+    """
+    try:
+        metadata = []
+        
+        # Get carrier information
+        if 'carrier' in fields:
+            carrier_name = _pn_carrier_name(parsed_number, "en")
+            if carrier_name:
+                metadata.append(('carrier', carrier_name))
+        
+        # Get geographic information
+        if 'location' in fields:
+            location = _pn_location(parsed_number, "en")
+            if location:
+                metadata.append(('location', location))
+        
+        # Get country code
+        if 'country_code' in fields:
+            metadata.append(('country_code', f"+{parsed_number.country_code}"))
+        
+        # Get number type
+        if 'number_type' in fields:
+            number_type = _pn_number_type(parsed_number)
+            metadata.append(('number_type', str(number_type).split('.')[-1] if number_type else "UNKNOWN"))
+        
+        return tuple(metadata)
+        
+    except Exception as e:
+        logger.debug("Could not get metadata for %s: %s", parsed_number, e)
+        return None
+
+class Contact(NamedTuple):
+    """Validated contact record, a compact alternative to the contact dictionary"""
+    name: str
+    phone: str
+    original_phone: str
+    carrier: Optional[str] = None
+    location: Optional[str] = None
+    country_code: Optional[str] = None
+    number_type: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, str]:
+        """Contact dictionary as used across the app, without unset metadata"""
+        return {field: value for field, value in zip(self._fields, self) if value is not None}
+
+def _validate_one_worker(contact: Dict[str, str], default_country: str, metadata_fields: FrozenSet[str]) -> Optional[Dict[str, str]]:
+    """Validate a single contact in a worker process (module-level so it can be pickled)"""
+    return ContactValidator(default_country, metadata_fields).validate_single_contact(contact)
+
 class ContactValidator:
     """Validate and format contact information"""
     
-    def __init__(self, default_country: str = config.DEFAULT_COUNTRY_CODE):
+    def __init__(self, default_country: str = config.DEFAULT_COUNTRY_CODE,
+                 metadata_fields: Iterable[str] = DEFAULT_METADATA_FIELDS):
         self.default_country = default_country
+        # Phone metadata added to validated contacts; see METADATA_FIELDS
+        self.metadata_fields = frozenset(metadata_fields)
     
     def validate_contacts(self, contacts: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
         """
@@ -31,16 +206,114 @@ class ContactValidator:
         valid_contacts = []
         invalid_contacts = []
         
-        for contact in contacts:
-            validated_contact = self.validate_single_contact(contact)
-            if validated_contact:
-                valid_contacts.append(validated_contact)
+        for is_valid, contact in self.ivalidate_contacts(contacts):
+            if is_valid:
+                valid_contacts.append(contact)
             else:
                 invalid_contacts.append(contact)
         
         logger.info(f"Validation results: {len(valid_contacts)} valid, {len(invalid_contacts)} invalid")
         return valid_contacts, invalid_contacts
     
+    def validate_and_dedupe(self, contacts: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """
+        Validate contacts and drop duplicate numbers in a single pass
+        
+        Equivalent to validate_contacts followed by remove_duplicates on the
+        valid contacts. Validated phones are already in E.164 form, so they
+        are used directly as the duplicate key.
+        
+        Args:
+            contacts: List of contact dictionaries with 'name' and 'phone' keys
+            
+        Returns:
+            Tuple of (unique_valid_contacts, invalid_contacts)
+        """
+        valid_contacts = []
+        invalid_contacts = []
+        seen_phones = set()
+        duplicates = 0
+        
+        for is_valid, contact in self.ivalidate_contacts(contacts):
+            if not is_valid:
+                invalid_contacts.append(contact)
+            elif contact['phone'] in seen_phones:
+                duplicates += 1
+                logger.debug("Removing duplicate contact: %s - %s", contact.get('name'), contact['phone'])
+            else:
+                seen_phones.add(contact['phone'])
+                valid_contacts.append(contact)
+        
+        logger.info(f"Validation results: {len(valid_contacts) + duplicates} valid, {len(invalid_contacts)} invalid")
+        logger.info("Removed %d duplicate contacts", duplicates)
+        return valid_contacts, invalid_contacts
+    
+    def ivalidate_contacts(self, contacts: Iterable[Dict[str, str]]) -> Iterator[Tuple[bool, Dict[str, str]]]:
+        """
+        Validate contacts lazily, one result at a time
+        
+        Args:
+            contacts: Iterable of contact dictionaries with 'name' and 'phone' keys
+            
+        Yields:
+            (True, validated_contact) for valid contacts, (False, original_contact) otherwise
+        """
+        if (isinstance(contacts, Sized) and len(contacts) >= config.PARALLEL_VALIDATION_THRESHOLD
+                and config.VALIDATION_WORKERS > 1):
+            # Large lists: spread the regex-heavy phonenumbers work across processes
+            worker = functools.partial(_validate_one_worker, default_country=self.default_country,
+                                       metadata_fields=self.metadata_fields)
+            with ProcessPoolExecutor(max_workers=config.VALIDATION_WORKERS) as executor:
+                for contact, validated_contact in zip(contacts, executor.map(worker, contacts, chunksize=256)):
+                    yield (True, validated_contact) if validated_contact else (False, contact)
+        else:
+            for contact in contacts:
+                validated_contact = self.validate_single_contact(contact)
+                yield (True, validated_contact) if validated_contact else (False, contact)
+    
+    def validate_contact_records(self, contacts: Iterable[Dict[str, str]]) -> Tuple[List[Contact], List[Dict[str, str]]]:
+        """
+        Validate contacts into compact Contact records
+        
+        Same checks as validate_contacts, but valid contacts are returned as
+        Contact tuples instead of dictionaries, which takes a fraction of the
+        memory on large contact lists.
+        
+        Returns:
+            Tuple of (valid_records, invalid_contacts)
+        """
+        valid_records = []
+        invalid_contacts = []
+        
+        for contact in contacts:
+            record = self.validate_contact_record(contact)
+            if record:
+                valid_records.append(record)
+            else:
+                invalid_contacts.append(contact)
+        
+        logger.info(f"Validation results: {len(valid_records)} valid, {len(invalid_contacts)} invalid")
+        return valid_records, invalid_contacts
+    
+    def validate_contacts_bulk(self, raw_text: str, region: Optional[str] = None) -> List[str]:
+        """
+        Find and validate every phone number in a block of free text
+        
+        Scans the whole text with phonenumbers.PhoneNumberMatcher in one pass
+        instead of parsing field by field, which suits raw contact dumps.
+        
+        Args:
+            raw_text: Text containing any number of phone numbers
+            region: Region for numbers without a country code (defaults to default_country)
+            
+        Returns:
+            Valid phone numbers in E.164 format, in the order they appear
+        """
+        matcher = PhoneNumberMatcher(raw_text, region or self.default_country)
+        numbers = [_pn_format(match.number, _E164) for match in matcher]
+        logger.info(f"Found {len(numbers)} valid phone numbers in text")
+        return numbers
+    
     def validate_single_contact(self, contact: Dict[str, str]) -> Optional[Dict[str, str]]:
         """
         Validate a single contact
@@ -51,42 +324,55 @@ class ContactValidator:
         Returns:
             Validated contact dictionary or None if invalid
         """
+        record = self.validate_contact_record(contact)
+        return record.to_dict() if record else None
+    
+    def validate_contact_record(self, contact: Dict[str, str]) -> Optional[Contact]:
+        """
+        Validate a single contact into a Contact record
+        
+        Args:
+            contact: Dictionary with 'name' and 'phone' keys
+            
+        Returns:
+            Contact record or None if invalid
+        """
         try:
             name = contact.get('name', '').strip()
             phone = contact.get('phone', '').strip()
             
             # Validate name
             if not self._is_valid_name(name):
-                logger.warning(f"Invalid name: '{name}'")
+                logger.warning("Invalid name: '%s'", name)
                 return None
             
-            # Validate and format phone number
-            formatted_phone = self.format_phone_number(phone)
-            if not formatted_phone:
-                logger.warning(f"Invalid phone number: '{phone}' for contact '{name}'")
+            # Parse, validate and format phone number in one go
+            parsed = self._parse_once(phone)
+            if not parsed:
+                logger.warning("Invalid phone number: '%s' for contact '%s'", phone, name)
                 return None
+            parsed_number, formatted_phone = parsed
             
             # Additional phone number checks
-            if not self._is_phone_number_valid(formatted_phone):
-                logger.warning(f"Phone number failed validation: '{formatted_phone}' for contact '{name}'")
+            if not self._is_phone_number_valid(parsed_number):
+                logger.warning("Phone number failed validation: '%s' for contact '%s'", formatted_phone, name)
                 return None
             
-            validated_contact = {
-                'name': self._clean_name(name),
-                'phone': formatted_phone,
-                'original_phone': phone  # Keep original for reference
-            }
-            
             # Add metadata if available
-            metadata = self._get_phone_metadata(formatted_phone)
-            if metadata:
-                validated_contact.update(metadata)
+            metadata = self._get_phone_metadata(parsed_number) or {}
             
-            logger.debug(f"Validated contact: {validated_contact['name']} - {validated_contact['phone']}")
-            return validated_contact
+            record = Contact(
+                name=self._clean_name(name),
+                phone=formatted_phone,
+                original_phone=phone,  # Keep original for reference
+                **metadata
+            )
+            
+            logger.debug("Validated contact: %s - %s", record.name, record.phone)
+            return record
             
         except Exception as e:
-            logger.error(f"Error validating contact {contact}: {str(e)}")
+            logger.error("Error validating contact %s: %s", contact, e)
             return None
     
     def format_phone_number(self, phone: str) -> Optional[str]:
@@ -99,46 +385,16 @@ class ContactValidator:
         Returns:
             Formatted phone number in international format or None if invalid
         """
-        try:
-            # Clean the phone number
-            cleaned_phone = self._clean_phone_number(phone)
-            
-            # Try to parse the phone number
-            try:
-                # First try with default country
-                parsed_number = phonenumbers.parse(cleaned_phone, self.default_country)
-            except NumberParseException:
-                # If that fails, try as international number
-                if not cleaned_phone.startswith('+'):
-                    cleaned_phone = '+' + cleaned_phone
-                parsed_number = phonenumbers.parse(cleaned_phone, None)
-            
-            # Check if the number is valid
-            if not phonenumbers.is_valid_number(parsed_number):
-                return None
-            
-            # Format as international number
-            formatted = phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.E164)
-            return formatted
-            
-        except Exception as e:
-            logger.debug(f"Could not format phone number '{phone}': {str(e)}")
-            return None
+        parsed = self._parse_once(phone)
+        return parsed[1] if parsed else None
+    
+    def _parse_once(self, phone: str) -> Optional[Tuple[PhoneNumber, str]]:
+        """Parse phone number once, returning (PhoneNumber, E.164 string) or None"""
+        return _parse_once(phone, self.default_country)
     
     def _clean_phone_number(self, phone: str) -> str:
         """Clean phone number by removing unnecessary characters"""
-        # Remove all non-digit and non-plus characters
-        cleaned = re.sub(r'[^\d+]', '', phone)
-        
-        # Handle common US formats
-        if len(cleaned) == 10 and not cleaned.startswith('+'):
-            # Assume US number
-            cleaned = '+1' + cleaned
-        elif len(cleaned) == 11 and cleaned.startswith('1') and not cleaned.startswith('+'):
-            # US number with country code but no plus
-            cleaned = '+' + cleaned
-        
-        return cleaned
+        return _clean_phone_number(phone)
     
     def _is_valid_name(self, name: str) -> bool:
         """Check if name is valid"""
@@ -149,95 +405,55 @@ class ContactValidator:
             return False
         
         # Check for valid name characters (letters, spaces, common punctuation)
-        valid_name_pattern = re.compile(r'^[a-zA-Z\s\.\-\']+$')
-        return bool(valid_name_pattern.match(name.strip()))
+        return bool(_NAME_VALID_RE.match(name.strip()))
     
     def _clean_name(self, name: str) -> str:
         """Clean and format name"""
-        # Remove extra whitespace
-        cleaned = re.sub(r'\s+', ' ', name.strip())
-        
-        # Title case
-        return cleaned.title()
+        # split() strips and collapses whitespace in one pass; title() keeps
+        # capitals after apostrophes and hyphens (O'Neil-Smith)
+        return ' '.join(name.split()).title()
     
-    def _is_phone_number_valid(self, phone: str) -> bool:
-        """Additional validation for phone numbers"""
-        try:
-            parsed_number = phonenumbers.parse(phone, None)
-            
-            # Check if it's a valid number
-            if not phonenumbers.is_valid_number(parsed_number):
-                return False
-            
-            # Check if it's a possible number
-            if not phonenumbers.is_possible_number(parsed_number):
-                return False
-            
-            # Additional checks can be added here
-            # For example, check against blocked country codes, etc.
-            
-            return True
-            
-        except Exception:
-            return False
+    def _is_phone_number_valid(self, parsed_number: PhoneNumber) -> bool:
+        """Additional validation for an already parsed phone number"""
+        return _is_phone_number_valid(parsed_number)
     
-    def _get_phone_metadata(self, phone: str) -> Optional[Dict[str, str]]:
-        """Get metadata about the phone number"""
-        try:
-            parsed_number = phonenumbers.parse(phone, None)
-            
-            metadata = {}
-            
-            # Get carrier information
-            carrier_name = carrier.name_for_number(parsed_number, "en")
-            if carrier_name:
-                metadata['carrier'] = carrier_name
-            
-            # Get geographic information
-            location = geocoder.description_for_number(parsed_number, "en")
-            if location:
-                metadata['location'] = location
-            
-            # Get country code
-            metadata['country_code'] = f"+{parsed_number.country_code}"
-            
-            # Get number type
-            number_type = phonenumbers.number_type(parsed_number)
-            metadata['number_type'] = str(number_type).split('.')[-1] if number_type else "UNKNOWN"
-            
-            return metadata
-            
-        except Exception as e:
-            logger.debug(f"Could not get metadata for {phone}: {str(e)}")
-            return None
+    def _get_phone_metadata(self, parsed_number: PhoneNumber) -> Optional[Dict[str, str]]:
+        """Get metadata about an already parsed phone number"""
+        metadata = _get_phone_metadata(parsed_number, self.metadata_fields)
+        return dict(metadata) if metadata is not None else None
     
     def remove_duplicates(self, contacts: List[Dict[str, str]]) -> List[Dict[str, str]]:
-        """Remove duplicate contacts based on phone number"""
-        seen_phones = set()
-        unique_contacts = []
+        """
+        Remove duplicate contacts based on phone number
+        
+        Numbers are compared in E.164 form so differently formatted copies of the
+        same number collapse; the first contact seen for each number is kept.
+        """
+        unique_by_phone = {}
         
         for contact in contacts:
             phone = contact.get('phone')
-            if phone and phone not in seen_phones:
-                seen_phones.add(phone)
-                unique_contacts.append(contact)
+            # Fall back to the raw string for numbers that do not parse
+            key = (self.format_phone_number(phone) or phone) if phone else None
+            if key and key not in unique_by_phone:
+                unique_by_phone[key] = contact
             else:
-                logger.debug(f"Removing duplicate contact: {contact.get('name')} - {phone}")
+                logger.debug("Removing duplicate contact: %s - %s", contact.get('name'), phone)
         
-        logger.info(f"Removed {len(contacts) - len(unique_contacts)} duplicate contacts")
+        unique_contacts = list(unique_by_phone.values())
+        logger.info("Removed %d duplicate contacts", len(contacts) - len(unique_contacts))
         return unique_contacts
     
     def filter_by_country(self, contacts: List[Dict[str, str]], country_codes: List[str]) -> List[Dict[str, str]]:
         """Filter contacts by country codes"""
+        # str.startswith checks every prefix in one call when given a tuple
+        prefixes = tuple(country_codes)
         filtered_contacts = []
         
         for contact in contacts:
             phone = contact.get('phone')
-            if phone:
-                for country_code in country_codes:
-                    if phone.startswith(country_code):
-                        filtered_contacts.append(contact)
-                        break
+            if phone and phone.startswith(prefixes):
+                filtered_contacts.append(contact)
         
         logger.info(f"Filtered to {len(filtered_contacts)} contacts from specified countries")
         return filtered_contacts
@@ -245,36 +461,86 @@ class ContactValidator:
     def save_validation_report(self, valid_contacts: List[Dict], invalid_contacts: List[Dict], output_path: str):
         """Save validation report to file"""
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
+            # Build the whole report in memory and write it once
+            parts = [
+                "# Contact Validation Report\n\n",
+                "## Summary\n",
+                f"- Total contacts processed: {len(valid_contacts) + len(invalid_contacts)}\n",
+                f"- Valid contacts: {len(valid_contacts)}\n",
+                f"- Invalid contacts: {len(invalid_contacts)}\n\n",
+            ]
+            
+            if valid_contacts:
+                parts.append(f"## Valid Contacts ({len(valid_contacts)})\n")
+                parts.extend(self._format_valid_line(i, contact) for i, contact in enumerate(valid_contacts, 1))
+                parts.append("\n")
+            
+            if invalid_contacts:
+                parts.append(f"## Invalid Contacts ({len(invalid_contacts)})\n")
+                parts.extend(self._format_invalid_line(i, contact) for i, contact in enumerate(invalid_contacts, 1))
+            
+            Path(output_path).write_text(''.join(parts), encoding='utf-8')
+            
+            logger.info(f"Validation report saved to {output_path}")
+            
+        except Exception as e:
+            logger.error(f"Error saving validation report: {str(e)}")
+    
+    def save_validation_report_stream(self, results: Iterable[Tuple[bool, Dict]], output_path: str):
+        """
+        Save a validation report while results are still being produced
+        
+        Args:
+            results: (is_valid, contact) pairs, e.g. from ivalidate_contacts
+            output_path: Report file path
+        
+        Valid contacts are written as they arrive and invalid ones are spooled to a
+        temporary file, so memory use does not grow with the number of contacts.
+        Totals are only known at the end, so the summary closes the report.
+        """
+        try:
+            valid_count = 0
+            invalid_count = 0
+            
+            with open(output_path, 'w', encoding='utf-8') as f, \
+                    tempfile.TemporaryFile('w+', encoding='utf-8') as invalid_spool:
                 f.write("# Contact Validation Report\n\n")
+                f.write("## Valid Contacts\n")
                 
-                f.write(f"## Summary\n")
-                f.write(f"- Total contacts processed: {len(valid_contacts) + len(invalid_contacts)}\n")
-                f.write(f"- Valid contacts: {len(valid_contacts)}\n")
-                f.write(f"- Invalid contacts: {len(invalid_contacts)}\n\n")
+                for is_valid, contact in results:
+                    if is_valid:
+                        valid_count += 1
+                        f.write(self._format_valid_line(valid_count, contact))
+                    else:
+                        invalid_count += 1
+                        invalid_spool.write(self._format_invalid_line(invalid_count, contact))
                 
-                if valid_contacts:
-                    f.write(f"## Valid Contacts ({len(valid_contacts)})\n")
-                    for i, contact in enumerate(valid_contacts, 1):
-                        f.write(f"{i}. {contact['name']} - {contact['phone']}")
-                        if 'location' in contact:
-                            f.write(f" ({contact['location']})")
-                        f.write("\n")
-                    f.write("\n")
+                f.write("\n## Invalid Contacts\n")
+                invalid_spool.seek(0)
+                shutil.copyfileobj(invalid_spool, f)
                 
-                if invalid_contacts:
-                    f.write(f"## Invalid Contacts ({len(invalid_contacts)})\n")
-                    for i, contact in enumerate(invalid_contacts, 1):
-                        f.write(f"{i}. {contact.get('name', 'Unknown')} - {contact.get('phone', 'Invalid')}\n")
+                f.write("\n## Summary\n")
+                f.write(f"- Total contacts processed: {valid_count + invalid_count}\n")
+                f.write(f"- Valid contacts: {valid_count}\n")
+                f.write(f"- Invalid contacts: {invalid_count}\n")
             
             logger.info(f"Validation report saved to {output_path}")
             
         except Exception as e:
             logger.error(f"Error saving validation report: {str(e)}")
+    
+    def _format_valid_line(self, index: int, contact: Dict) -> str:
+        """Format one valid contact as a report line"""
+        location = f" ({contact['location']})" if 'location' in contact else ""
+        return f"{index}. {contact['name']} - {contact['phone']}{location}\n"
+    
+    def _format_invalid_line(self, index: int, contact: Dict) -> str:
+        """Format one invalid contact as a report line"""
+        return f"{index}. {contact.get('name', 'Unknown')} - {contact.get('phone', 'Invalid')}\n"
 
 def main():
     """Test the contact validator"""
-    validator = ContactValidator()
+    validator = ContactValidator(metadata_fields=METADATA_FIELDS)
     
     # Test contacts
     test_contacts = [
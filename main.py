@@ -8,7 +8,9 @@ Usage:
     python main.py --interactive  # Interactive mode
 """
 import argparse
+import contextlib
 import logging
+import signal
 import sys
 import time
 from pathlib import Path
@@ -19,21 +21,23 @@ from colorama import Fore, Back, Style
 # Import our modules
 import config
 from ocr_extractor import ContactExtractor
-from contact_validator import ContactValidator
+from contact_validator import ContactValidator, DEFAULT_METADATA_FIELDS, METADATA_FIELDS
 from message_handler import MessageHandler
-from whatsapp_automation import WhatsAppAutomation
 
 # Initialize colorama for colored output
 colorama.init()
 
+# Timestamp shared by this session's log file and report
+SESSION_STAMP = str(int(time.time()))
+
 # Setup logging
 def setup_logging():
     """Setup logging configuration"""
-    # Create logs directory if it doesn't exist
-    config.LOGS_DIR.mkdir(exist_ok=True)
+    # Create project directories (logs, messages, ...) if they don't exist
+    config.ensure_dirs()
     
     # Setup file handler
-    log_file = config.LOGS_DIR / f"whatsapp_automation_{int(time.time())}.log"
+    log_file = config.LOGS_DIR / f"whatsapp_automation_{SESSION_STAMP}.log"
     
     # Configure logging
     logging.basicConfig(
@@ -49,6 +53,31 @@ def setup_logging():
     logger.info(f"Logging initialized - Log file: {log_file}")
     return logger
 
+@contextlib.contextmanager
+def stop_on_interrupt(sender):
+    """
+    Make Ctrl+C stop a batch send cleanly
+    
+    The first Ctrl+C asks the sender to stop after the message it is sending,
+    so sent numbers and progress are saved as usual. A second one interrupts
+    at once, as Ctrl+C normally does.
+    
+    Args:
+        sender: WhatsAppAutomation or WhatsAppDriverPool doing the sending
+    """
+    previous_handler = signal.getsignal(signal.SIGINT)
+    
+    def handle_interrupt(signum, frame):
+        signal.signal(signal.SIGINT, previous_handler)
+        print(f"\n{Fore.YELLOW}⏹  Stopping after the current message (Ctrl+C again to abort)...{Style.RESET_ALL}")
+        sender.request_stop()
+    
+    signal.signal(signal.SIGINT, handle_interrupt)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+
 class WhatsAppMessagingBot:
     """Main orchestration class for WhatsApp messaging automation"""
     
@@ -100,10 +129,12 @@ class WhatsAppMessagingBot:
         """Validate and format contacts"""
         self.logger.info("Validating contacts...")
         
-        valid_contacts, invalid_contacts = self.contact_validator.validate_contacts(contacts)
+        # Only look up the phone metadata the message template can use
+        placeholders = set(self.message_handler.get_template_stats().get('placeholders_used', []))
+        self.contact_validator.metadata_fields = DEFAULT_METADATA_FIELDS | (placeholders & set(METADATA_FIELDS))
         
-        # Remove duplicates
-        valid_contacts = self.contact_validator.remove_duplicates(valid_contacts)
+        # Validate and remove duplicates in one pass
+        valid_contacts, invalid_contacts = self.contact_validator.validate_and_dedupe(contacts)
         
         self.stats['contacts_validated'] = len(valid_contacts)
         
@@ -150,7 +181,13 @@ class WhatsAppMessagingBot:
         
         self.logger.info(f"Starting to send messages to {len(contacts)} contacts...")
         
-        # Initialize WhatsApp automation
+        # Spread contacts over several browser sessions if configured
+        sessions = min(config.MAX_CONCURRENT_SENDS, len(contacts))
+        if sessions > 1:
+            return self._send_messages_concurrently(contacts, sessions)
+        
+        # Initialize WhatsApp automation (imported here so Selenium only loads when sending)
+        from whatsapp_automation import WhatsAppAutomation
         self.whatsapp_automation = WhatsAppAutomation(headless=config.HEADLESS_MODE)
         
         try:
@@ -160,14 +197,14 @@ class WhatsAppMessagingBot:
                 return {}
             
             # Send messages with rate limiting
-            results = self.whatsapp_automation.send_messages_to_contacts(
-                contacts, 
-                self.message_handler.get_template()
-            )
+            with stop_on_interrupt(self.whatsapp_automation):
+                results = self.whatsapp_automation.send_messages_to_contacts(
+                    contacts, 
+                    self.message_handler.get_template()
+                )
             
             # Update statistics
-            self.stats['messages_sent'] = sum(1 for success in results.values() if success)
-            self.stats['messages_failed'] = sum(1 for success in results.values() if not success)
+            self._update_send_stats(results)
             
             return results
             
@@ -179,13 +216,55 @@ class WhatsAppMessagingBot:
             if self.whatsapp_automation:
                 self.whatsapp_automation.close()
     
+    def _send_messages_concurrently(self, contacts: List[Dict[str, str]], sessions: int) -> Dict[str, bool]:
+        """
+        Send messages using several WhatsApp Web sessions at once
+        
+        Each session drives its own browser, so the page loads and rate-limit
+        waits of one session overlap with the others.
+        
+        Args:
+            contacts: List of contact dictionaries
+            sessions: Number of browser sessions to run in parallel
+            
+        Returns:
+            Dictionary with contact names as keys and success status as values
+        """
+        from whatsapp_automation import WhatsAppDriverPool
+        
+        try:
+            with WhatsAppDriverPool(size=sessions, headless=config.HEADLESS_MODE) as pool:
+                if not pool.start():
+                    self.logger.error("Failed to login to WhatsApp Web")
+                    return {}
+                
+                with stop_on_interrupt(pool):
+                    results = pool.send_messages_to_contacts(contacts, self.message_handler.get_template())
+            
+            # Update statistics
+            self._update_send_stats(results)
+            
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"Error during message sending: {str(e)}")
+            return {}
+    
+    def _update_send_stats(self, results: Dict[str, bool]):
+        """Update sent/failed counters from send results in a single pass"""
+        sent = sum(results.values())  # True counts as 1
+        self.stats['messages_sent'] = sent
+        self.stats['messages_failed'] = len(results) - sent
+    
     def print_results(self, results: Dict[str, bool]):
         """Print results summary"""
         print(f"\n{Fore.CYAN}📊 Results Summary{Style.RESET_ALL}")
         print("=" * 50)
         
-        successful = [name for name, success in results.items() if success]
-        failed = [name for name, success in results.items() if not success]
+        successful = []
+        failed = []
+        for name, success in results.items():
+            (successful if success else failed).append(name)
         
         print(f"✅ Successfully sent: {len(successful)}")
         print(f"❌ Failed to send: {len(failed)}")
@@ -193,13 +272,11 @@ class WhatsAppMessagingBot:
         
         if successful:
             print(f"\n{Fore.GREEN}✅ Successful:{Style.RESET_ALL}")
-            for name in successful:
-                print(f"  ✓ {name}")
+            print("\n".join(f"  ✓ {name}" for name in successful))
         
         if failed:
             print(f"\n{Fore.RED}❌ Failed:{Style.RESET_ALL}")
-            for name in failed:
-                print(f"  ✗ {name}")
+            print("\n".join(f"  ✗ {name}" for name in failed))
         
         # Print overall statistics
         print(f"\n{Fore.YELLOW}📈 Session Statistics:{Style.RESET_ALL}")
@@ -214,34 +291,33 @@ class WhatsAppMessagingBot:
     
     def save_report(self, contacts: List[Dict[str, str]], results: Dict[str, bool]) -> str:
         """Save execution report to file"""
-        timestamp = int(time.time())
-        report_file = config.LOGS_DIR / f"execution_report_{timestamp}.txt"
+        report_file = config.LOGS_DIR / f"execution_report_{SESSION_STAMP}.txt"
         
         try:
-            with open(report_file, 'w', encoding='utf-8') as f:
-                f.write("WhatsApp Messaging Automation Report\n")
-                f.write("=" * 50 + "\n\n")
-                
-                # Session info
-                f.write(f"Date: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Contacts processed: {len(contacts)}\n")
-                f.write(f"Messages sent: {self.stats['messages_sent']}\n")
-                f.write(f"Messages failed: {self.stats['messages_failed']}\n\n")
-                
+            # Session info
+            lines = [
+                "WhatsApp Messaging Automation Report\n",
+                "=" * 50 + "\n\n",
+                f"Date: {time.strftime('%Y-%m-%d %H:%M:%S')}\n",
+                f"Contacts processed: {len(contacts)}\n",
+                f"Messages sent: {self.stats['messages_sent']}\n",
+                f"Messages failed: {self.stats['messages_failed']}\n\n",
                 # Detailed results
-                f.write("Detailed Results:\n")
-                f.write("-" * 20 + "\n")
-                
-                for contact in contacts:
-                    name = contact['name']
-                    phone = contact['phone']
-                    status = "✓ SENT" if results.get(name, False) else "✗ FAILED"
-                    f.write(f"{status} - {name} ({phone})\n")
-                
-                # Message template used
-                f.write(f"\nMessage Template Used:\n")
-                f.write("-" * 20 + "\n")
-                f.write(self.message_handler.get_template())
+                "Detailed Results:\n",
+                "-" * 20 + "\n",
+            ]
+            
+            lines.extend(
+                f"{'✓ SENT' if results.get(contact['name'], False) else '✗ FAILED'} - {contact['name']} ({contact['phone']})\n"
+                for contact in contacts
+            )
+            
+            # Message template used
+            lines.append("\nMessage Template Used:\n")
+            lines.append("-" * 20 + "\n")
+            lines.append(self.message_handler.get_template())
+            
+            report_file.write_text(''.join(lines), encoding='utf-8')
             
             self.logger.info(f"Report saved to: {report_file}")
             return str(report_file)
@@ -336,6 +412,18 @@ class WhatsAppMessagingBot:
                 print(f"{Fore.RED}❌ No contacts found!{Style.RESET_ALL}")
                 return
             
+            # Load custom message if provided (before validation, which reads its placeholders)
+            if args.message:
+                # Swap the template on the existing handler instead of building a new one
+                try:
+                    custom_template = Path(args.message).read_text(encoding='utf-8')
+                except OSError as e:
+                    self.logger.error(f"Error loading message template: {str(e)}")
+                    custom_template = None
+                
+                if custom_template is not None and self.message_handler.set_template(custom_template):
+                    print(f"📝 Using custom message from: {args.message}")
+            
             # Validate contacts
             valid_contacts = self.validate_contacts(contacts)
             
@@ -343,13 +431,6 @@ class WhatsAppMessagingBot:
                 print(f"{Fore.RED}❌ No valid contacts found!{Style.RESET_ALL}")
                 return
             
-            # Load custom message if provided
-            if args.message:
-                custom_handler = MessageHandler(args.message)
-                if custom_handler.get_template():
-                    self.message_handler = custom_handler
-                    print(f"📝 Using custom message from: {args.message}")
-            
             # Preview messages if requested
             if not args.no_preview:
                 self.preview_messages(valid_contacts)
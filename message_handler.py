@@ -2,7 +2,9 @@
 Message Handler
 Handles reading messages from files and personalizing them for contacts
 """
+import re
 import logging
+import functools
 from pathlib import Path
 from typing import Optional, Dict, List
 import config
@@ -10,12 +12,55 @@ import config
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Placeholders that personalize_message knows how to fill, matched in a single pass
+PLACEHOLDERS = ('name', 'phone', 'first_name', 'location', 'carrier', 'country_code')
+_KNOWN_PLACEHOLDER_RE = re.compile(r'\{(' + '|'.join(PLACEHOLDERS) + r')\}')
+
+# Any {word} placeholder, known or not
+_PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+
+# Basic spam detection, combined into one alternation so the template is scanned once
+_SUSPICIOUS_PATTERNS = (
+    r'click\s+here\s+now',
+    r'urgent.*action.*required',
+    r'limited.*time.*offer',
+    r'congratulations.*you.*won',
+    r'free.*money',
+    r'suspicious.*activity',
+)
+_SUSPICIOUS_RE = re.compile('|'.join(f'(?:{p})' for p in _SUSPICIOUS_PATTERNS), re.IGNORECASE)
+
+# Words suggest_improvements looks for (substring match on the lowercased template)
+_GREETINGS = ('hi', 'hello', 'hey', 'greetings')
+_POLITE_WORDS = ('please', 'thank', 'appreciate', 'grateful')
+
+# Source expression for each placeholder in the generated render function (contact is `c`)
+_PLACEHOLDER_EXPRESSIONS = {
+    'name': "c.get('name', 'Friend')",
+    'phone': "c.get('phone', '')",
+    'first_name': "(c['_first_name'] if '_first_name' in c else _first_name(c.get('name', '')))",
+    'location': "c.get('location', '')",
+    'carrier': "c.get('carrier', '')",
+    'country_code': "c.get('country_code', '')",
+}
+
+@functools.lru_cache(maxsize=4096)
+def _first_name(full_name: str) -> str:
+    """Extract first name from full name (cached; group lists repeat names)"""
+    if not full_name:
+        return ""
+    
+    # Split off the first word only; no need to split the whole name
+    parts = full_name.split(None, 1)
+    return parts[0] if parts else ""
+
 class MessageHandler:
     """Handle message reading and personalization"""
     
     def __init__(self, message_file_path: Optional[str] = None):
         self.message_file_path = Path(message_file_path) if message_file_path else config.DEFAULT_MESSAGE_FILE
         self.message_template = ""
+        self._compile_template()
         self.load_message_template()
     
     def load_message_template(self) -> bool:
@@ -25,15 +70,15 @@ class MessageHandler:
                 logger.error(f"Message file not found: {self.message_file_path}")
                 return False
             
-            with open(self.message_file_path, 'r', encoding='utf-8') as f:
-                self.message_template = f.read().strip()
+            self.message_template = self.message_file_path.read_text(encoding='utf-8').strip()
+            self._compile_template()
             
             if not self.message_template:
                 logger.error("Message template is empty")
                 return False
             
-            logger.info(f"Loaded message template from {self.message_file_path}")
-            logger.debug(f"Template preview: {self.message_template[:100]}...")
+            logger.info("Loaded message template from %s", self.message_file_path)
+            logger.debug("Template preview: %.100s...", self.message_template)
             return True
             
         except Exception as e:
@@ -52,6 +97,7 @@ class MessageHandler:
                 return False
             
             self.message_template = template.strip()
+            self._compile_template()
             logger.info("Message template updated")
             return True
             
@@ -69,41 +115,57 @@ class MessageHandler:
         Returns:
             Personalized message string
         """
-        try:
-            # Available placeholders
-            placeholders = {
-                'name': contact.get('name', 'Friend'),
-                'phone': contact.get('phone', ''),
-                'first_name': self._get_first_name(contact.get('name', '')),
-                'location': contact.get('location', ''),
-                'carrier': contact.get('carrier', ''),
-                'country_code': contact.get('country_code', '')
-            }
-            
-            # Replace placeholders in template
-            personalized = self.message_template
-            for placeholder, value in placeholders.items():
-                personalized = personalized.replace(f'{{{placeholder}}}', value)
-            
-            logger.debug(f"Personalized message for {contact.get('name', 'Unknown')}")
-            return personalized
-            
-        except Exception as e:
-            logger.error(f"Error personalizing message for {contact}: {str(e)}")
-            return self.message_template  # Return template as fallback
+        personalized = self._render(contact)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Personalized message for %s", contact.get('name', 'Unknown'))
+        return personalized
+    
+    def _compile_template(self):
+        """
+        Generate a render function specialized to the current template
+        
+        The template is split into literal text and known placeholders once, and
+        turned into a single string join, so personalizing a contact does no
+        template scanning at all. Literals are embedded with repr(), so template
+        text can never become code. Unknown placeholders stay as literal text.
+        A template without placeholders is returned as-is.
+        """
+        pieces = _KNOWN_PLACEHOLDER_RE.split(self.message_template)
+        
+        # No placeholders: every contact gets the template itself, unchanged
+        self._has_placeholders = len(pieces) > 1
+        if not self._has_placeholders:
+            template = self.message_template
+            self._render = lambda contact: template
+            return
+        
+        parts = []
+        for i, piece in enumerate(pieces):
+            if i % 2:
+                parts.append(_PLACEHOLDER_EXPRESSIONS[piece])
+            elif piece:
+                parts.append(repr(piece))
+        
+        body = "''.join((" + ", ".join(parts) + ",))"
+        namespace = {'_first_name': _first_name}
+        exec(f"def _render(c):\n    return {body}\n", namespace)
+        self._render = namespace['_render']
     
     def _get_first_name(self, full_name: str) -> str:
         """Extract first name from full name"""
-        try:
-            if not full_name:
-                return ""
-            
-            # Split by space and take first part
-            parts = full_name.strip().split()
-            return parts[0] if parts else ""
-            
-        except Exception:
-            return full_name
+        return _first_name(full_name)
+    
+    def _prepare_contacts(self, contacts: List[Dict[str, str]]) -> None:
+        """
+        Precompute per-contact values used by personalize_message
+        
+        Stores the first name on each contact under '_first_name' so repeated
+        personalization of the same contacts does not split the name again.
+        """
+        for contact in contacts:
+            if '_first_name' not in contact:
+                contact['_first_name'] = self._get_first_name(contact.get('name', ''))
     
     def validate_template(self) -> Dict[str, bool]:
         """
@@ -121,33 +183,22 @@ class MessageHandler:
         
         try:
             # Check for valid placeholders
-            valid_placeholders = {'name', 'phone', 'first_name', 'location', 'carrier', 'country_code'}
-            import re
+            valid_placeholders = set(PLACEHOLDERS)
             
             # Find all placeholders in template
-            placeholders_in_template = set(re.findall(r'\{(\w+)\}', self.message_template))
+            placeholders_in_template = set(_PLACEHOLDER_RE.findall(self.message_template))
             
             # Check if all placeholders are valid
             invalid_placeholders = placeholders_in_template - valid_placeholders
             if invalid_placeholders:
-                logger.warning(f"Invalid placeholders found: {invalid_placeholders}")
+                logger.warning("Invalid placeholders found: %s", invalid_placeholders)
                 validation_results['valid_placeholders'] = False
             
             # Check for suspicious content (basic spam detection)
-            suspicious_patterns = [
-                r'click\s+here\s+now',
-                r'urgent.*action.*required',
-                r'limited.*time.*offer',
-                r'congratulations.*you.*won',
-                r'free.*money',
-                r'suspicious.*activity'
-            ]
-            
-            for pattern in suspicious_patterns:
-                if re.search(pattern, self.message_template, re.IGNORECASE):
-                    logger.warning(f"Potentially suspicious content detected: {pattern}")
-                    validation_results['no_suspicious_content'] = False
-                    break
+            suspicious_match = _SUSPICIOUS_RE.search(self.message_template)
+            if suspicious_match:
+                logger.warning("Potentially suspicious content detected: %s", suspicious_match.group(0))
+                validation_results['no_suspicious_content'] = False
             
         except Exception as e:
             logger.error(f"Error validating template: {str(e)}")
@@ -167,34 +218,30 @@ class MessageHandler:
             List of preview dictionaries with contact info and personalized message
         """
         previews = []
+        selected = contacts[:limit]
+        self._prepare_contacts(selected)
         
-        try:
-            for i, contact in enumerate(contacts[:limit]):
-                personalized_message = self.personalize_message(contact)
-                
-                preview = {
-                    'contact_name': contact.get('name', 'Unknown'),
-                    'contact_phone': contact.get('phone', ''),
-                    'personalized_message': personalized_message,
-                    'message_length': len(personalized_message)
-                }
-                
-                previews.append(preview)
-            
-            logger.info(f"Generated {len(previews)} message previews")
+        for contact in selected:
+            personalized_message = self.personalize_message(contact)
+            
+            preview = {
+                'contact_name': contact.get('name', 'Unknown'),
+                'contact_phone': contact.get('phone', ''),
+                'personalized_message': personalized_message,
+                'message_length': len(personalized_message)
+            }
             
-        except Exception as e:
-            logger.error(f"Error generating message previews: {str(e)}")
+            previews.append(preview)
         
+        logger.info("Generated %d message previews", len(previews))
         return previews
     
     def save_template_to_file(self, file_path: str) -> bool:
         """Save current template to a file"""
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(self.message_template)
+            Path(file_path).write_text(self.message_template, encoding='utf-8')
             
-            logger.info(f"Template saved to {file_path}")
+            logger.info("Template saved to %s", file_path)
             return True
             
         except Exception as e:
@@ -206,10 +253,11 @@ class MessageHandler:
         try:
             import time
             timestamp = int(time.time())
+            config.ensure_dirs()
             backup_path = config.MESSAGES_DIR / f"message_backup_{timestamp}.txt"
             
             if self.save_template_to_file(str(backup_path)):
-                logger.info(f"Template backed up to {backup_path}")
+                logger.info("Template backed up to %s", backup_path)
                 return str(backup_path)
             
             return None
@@ -220,22 +268,17 @@ class MessageHandler:
     
     def get_template_stats(self) -> Dict[str, any]:
         """Get statistics about the current template"""
-        try:
-            import re
-            
-            stats = {
-                'character_count': len(self.message_template),
-                'word_count': len(self.message_template.split()),
-                'line_count': len(self.message_template.split('\n')),
-                'placeholder_count': len(re.findall(r'\{\w+\}', self.message_template)),
-                'placeholders_used': list(set(re.findall(r'\{(\w+)\}', self.message_template)))
-            }
-            
-            return stats
-            
-        except Exception as e:
-            logger.error(f"Error getting template stats: {str(e)}")
-            return {}
+        placeholders = _PLACEHOLDER_RE.findall(self.message_template)
+        
+        stats = {
+            'character_count': len(self.message_template),
+            'word_count': len(self.message_template.split()),
+            'line_count': self.message_template.count('\n') + 1,
+            'placeholder_count': len(placeholders),
+            'placeholders_used': list(set(placeholders))
+        }
+        
+        return stats
     
     def create_sample_template(self) -> str:
         """Create a sample message template"""
@@ -266,9 +309,10 @@ Best regards"""
             if '{name}' not in self.message_template and '{first_name}' not in self.message_template:
                 suggestions.append("Add personalization with {name} or {first_name} placeholder")
             
+            lowered = self.message_template.lower()
+            
             # Check for greeting
-            greetings = ['hi', 'hello', 'hey', 'greetings']
-            if not any(greeting in self.message_template.lower() for greeting in greetings):
+            if not any(greeting in lowered for greeting in _GREETINGS):
                 suggestions.append("Consider adding a friendly greeting")
             
             # Check for call-to-action
@@ -276,8 +320,7 @@ Best regards"""
                 suggestions.append("Consider adding a question to encourage responses")
             
             # Check for politeness
-            polite_words = ['please', 'thank', 'appreciate', 'grateful']
-            if not any(word in self.message_template.lower() for word in polite_words):
+            if not any(word in lowered for word in _POLITE_WORDS):
                 suggestions.append("Consider adding polite expressions")
             
         except Exception as e:
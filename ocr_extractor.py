@@ -3,7 +3,13 @@ OCR Contact Extractor
 Extracts contact names and phone numbers from WhatsApp group participant images
 """
 import re
+import shlex
+import string
 import logging
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 import cv2
@@ -12,14 +18,89 @@ from PIL import Image
 import pytesseract
 import config
 
+# Optional: tesserocr keeps Tesseract and its language model loaded between images
+try:
+    from tesserocr import PyTessBaseAPI
+except ImportError:
+    PyTessBaseAPI = None
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# OCR artifacts and WhatsApp prefixes/suffixes around names
+_NAME_PREFIX_RE = re.compile(r'^[QS\$\@\#\-g\-é«\*D\.\(\)\©\"\']*\s*[~•\-\s]*')
+_NAME_SUFFIX_RE = re.compile(r'[;GH\\KN°\.UxXY:]*$')
+_NAME_ALLOWED_RE = re.compile(r'^[a-zA-Z\s\.\-\'\(\)0-9]+$')
+
+# Name cleanup (_clean_name strips a few more artifacts than _is_likely_name)
+_CLEAN_PREFIX_RE = re.compile(r'^[QS\$\@\#\-g\-é«\*D\.\(\)\©\"\'bd]*\s*[~•\-\s]*')
+_CLEAN_SUFFIX_RE = re.compile(r'[;GH\\KN°\.UxXY:\*]*$')
+
+class _NameCharTable(dict):
+    """str.translate table keeping ASCII letters, dots, apostrophes and hyphens; anything else becomes a space"""
+    
+    def __missing__(self, code: int) -> str:
+        return ' '
+
+_NAME_KEEP = _NameCharTable((ord(char), char) for char in string.ascii_letters + ".'-")
+
+# Phone number cleanup
+_PHONE_STRIP_RE = re.compile(r'[\s\-\(\)]')
+
+# Phone number patterns, tried in order; the first pattern that matches anywhere wins.
+# The old "+91" and "simple format" patterns only ever matched where an earlier
+# pattern had already matched, so they are left out.
+_INTERNATIONAL_PHONE_PATTERNS = [re.compile(p) for p in (
+    r'\+\d{1,3}\s*\d{5}\s*\d{5}',                             # +91 98765 43210
+    r'\+\d{1,3}\s*\d{2,5}\s*\d{2,5}\s*\d{2,5}',              # Various international formats
+    r'\+\d{1,3}[\s\-]?\(?\d{3}\)?[\s\-]?\d{3}[\s\-]?\d{4}',   # US format with country code
+    r'\+\d{1,3}[\s\-]?\d{3,5}[\s\-]?\d{3,5}[\s\-]?\d{3,5}',  # General international
+)]
+_DOMESTIC_PHONE_RE = re.compile(r'\(?\d{3}\)?[\s\-]?\d{3}[\s\-]?\d{4}')  # US format
+
+# Page segmentation / engine mode options and -c variables in TESSERACT_CONFIG, for tesserocr
+_TESSERACT_MODE_RE = re.compile(r'--(psm|oem)\s+(\d+)')
+_TESSERACT_VARIABLE_RE = re.compile(r'-c\s+(\w+)=(\S+)')
+
+# Share of pixels the two most common gray levels (out of 16 bins) must hold for
+# a screenshot to be passed to OCR without blur/threshold
+_HIGH_CONTRAST_SHARE = 0.9
+
+def _cuda_available() -> bool:
+    """Check whether OpenCV was built with CUDA and can see a GPU"""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+def _is_high_contrast(image: np.ndarray) -> bool:
+    """Check whether a grayscale image is already nearly two-tone (e.g. a light-theme screenshot)"""
+    histogram = cv2.calcHist([image], [0], None, [16], [0, 256]).ravel()
+    top_two = np.partition(histogram, -2)[-2:].sum()
+    return top_two >= _HIGH_CONTRAST_SHARE * image.size
+
+def _otsu_level(histogram: np.ndarray) -> float:
+    """Otsu's threshold for a 256-bin histogram, chosen the same way as cv2.THRESH_OTSU"""
+    histogram = histogram.astype(np.float64)
+    weight_bg = np.cumsum(histogram)
+    weight_fg = weight_bg[-1] - weight_bg
+    intensity_sum = np.cumsum(histogram * np.arange(256))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_bg = intensity_sum / weight_bg
+        mean_fg = (intensity_sum[-1] - intensity_sum) / weight_fg
+        between_class_variance = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    
+    return float(np.argmax(np.nan_to_num(between_class_variance)))
+
 class ContactExtractor:
     """Extract contacts from WhatsApp group participant images using OCR"""
     
     def __init__(self):
         self.tesseract_config = config.TESSERACT_CONFIG
+        self.use_gpu = config.OCR_USE_GPU and _cuda_available()
+        # One tesserocr API per thread (an API instance is not thread-safe)
+        self._tesseract_local = threading.local()
     
     def extract_contacts_from_image(self, image_path: str) -> List[Dict[str, str]]:
         """
@@ -40,7 +121,7 @@ class ContactExtractor:
             processed_image = self._preprocess_image(image_path)
             
             # Extract text using OCR
-            text = pytesseract.image_to_string(processed_image, config=self.tesseract_config)
+            text = self._image_to_string(processed_image)
             
             # Parse contacts from extracted text
             contacts = self._parse_contacts_from_text(text)
@@ -52,6 +133,86 @@ class ContactExtractor:
             logger.error(f"Error extracting contacts from {image_path}: {str(e)}")
             return []
     
+    def extract_contacts_from_images(self, image_paths: List[str]) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Extract contacts from several image files with a single Tesseract run
+        
+        Every image is preprocessed and written to a temporary directory, and
+        Tesseract OCRs them all from one list file, so the engine and language
+        data are loaded once instead of once per image.
+        
+        Args:
+            image_paths: Paths to the image files
+            
+        Returns:
+            Dict mapping each image path to its list of contacts
+        """
+        results = {image_path: [] for image_path in image_paths}
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            page_files = [str(tmp_path / f"page_{index}.bmp") for index in range(len(image_paths))]
+            
+            # Preprocess the images side by side; OpenCV releases the GIL while it works
+            with ThreadPoolExecutor(max_workers=config.OCR_WORKERS) as executor:
+                prepared = list(executor.map(self._write_ocr_page, image_paths, page_files))
+            
+            batch = [image_path for image_path, ok in zip(image_paths, prepared) if ok]
+            page_files = [page_file for page_file, ok in zip(page_files, prepared) if ok]
+            
+            if not batch:
+                return results
+            
+            list_file = tmp_path / "pages.txt"
+            list_file.write_text("\n".join(page_files) + "\n", encoding='utf-8')
+            
+            try:
+                pytesseract.pytesseract.run_tesseract(
+                    str(list_file), str(tmp_path / "output"), extension='txt',
+                    lang=None, config=self.tesseract_config
+                )
+                text = (tmp_path / "output.txt").read_text(encoding='utf-8')
+            except Exception as e:
+                logger.error(f"Error running OCR on {len(batch)} images: {str(e)}")
+                return results
+        
+        # Tesseract ends the text of every page with a form feed
+        for image_path, page_text in zip(batch, text.split('\f')):
+            contacts = self._parse_contacts_from_text(page_text)
+            results[image_path] = contacts
+            logger.info(f"Extracted {len(contacts)} contacts from {image_path}")
+        
+        return results
+    
+    def _write_ocr_page(self, image_path: str, page_file: str) -> bool:
+        """Preprocess an image and save it for batch OCR; returns False if it can't be used"""
+        try:
+            if not self._is_valid_image(image_path):
+                raise ValueError(f"Unsupported image format: {image_path}")
+            
+            return cv2.imwrite(page_file, self._preprocess_image(image_path))
+            
+        except Exception as e:
+            logger.error(f"Error extracting contacts from {image_path}: {str(e)}")
+            return False
+    
+    def extract_contacts_batch(self, image_paths: List[str]) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Extract contacts from several image files in parallel
+        
+        Each image is OCRed by its own Tesseract process; the worker threads
+        just wait on those processes, so they run side by side up to
+        config.OCR_WORKERS at a time.
+        
+        Args:
+            image_paths: Paths to the image files
+            
+        Returns:
+            Dict mapping each image path to its list of contacts
+        """
+        with ThreadPoolExecutor(max_workers=config.OCR_WORKERS) as executor:
+            return dict(zip(image_paths, executor.map(self.extract_contacts_from_image, image_paths)))
+    
     def _is_valid_image(self, image_path: str) -> bool:
         """Check if the image format is supported"""
         path = Path(image_path)
@@ -60,30 +221,100 @@ class ContactExtractor:
     def _preprocess_image(self, image_path: str) -> np.ndarray:
         """
         Preprocess image for better OCR results
-        - Convert to grayscale
-        - Apply noise reduction
-        - Enhance contrast
+        - Load as grayscale
+        - Crop to the text area (config.OCR_CROP)
+        - Scale down to config.OCR_MAX_WIDTH
+        - Apply noise reduction and enhance contrast, unless the image is
+          already high-contrast
+        - Make sure the text is dark on a light background
         """
-        # Read image
-        image = cv2.imread(image_path)
+        # Read image, decoding straight to grayscale
+        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
         
         if image is None:
             raise ValueError(f"Could not load image: {image_path}")
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        # Crop to the text area first so every following step touches fewer pixels
+        height, width = image.shape[:2]
+        left, top, right, bottom = config.OCR_CROP
+        image = image[int(height * top):int(height * bottom), int(width * left):int(width * right)]
+        
+        # Scale high-DPI screenshots down; their text is larger than Tesseract needs
+        if image.shape[1] > config.OCR_MAX_WIDTH:
+            scale = config.OCR_MAX_WIDTH / image.shape[1]
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        if _is_high_contrast(image):
+            # Already close to black and white: blurring would only soften the glyphs
+            thresh = image
+        elif self.use_gpu:
+            thresh = self._binarize_on_gpu(image)
+        else:
+            # Apply Gaussian blur to reduce noise
+            blurred = cv2.GaussianBlur(image, (5, 5), 0)
+            
+            # Apply threshold to get black and white image
+            _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        
+        # Dark theme screenshots come out as white text on black; flip them so
+        # Tesseract always gets dark text and can skip its inverted-text retries
+        if cv2.mean(thresh)[0] < 127:
+            thresh = cv2.bitwise_not(thresh)
+        
+        return thresh
+    
+    def _binarize_on_gpu(self, image: np.ndarray) -> np.ndarray:
+        """
+        Blur and Otsu-threshold a grayscale image on the GPU
+        
+        The image stays on the device between steps; only the 256-bin histogram
+        used to pick the Otsu level and the final binary image are downloaded.
+        """
+        gpu_image = cv2.cuda_GpuMat()
+        gpu_image.upload(image)
         
         # Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        gaussian = cv2.cuda.createGaussianFilter(cv2.CV_8UC1, cv2.CV_8UC1, (5, 5), 0)
+        blurred = gaussian.apply(gpu_image)
+        
+        # CUDA threshold has no Otsu mode, so compute the level from the histogram
+        histogram = cv2.cuda.calcHist(blurred).download().ravel()
+        _, thresh = cv2.cuda.threshold(blurred, _otsu_level(histogram), 255, cv2.THRESH_BINARY)
+        
+        return thresh.download()
+    
+    def _image_to_string(self, image: np.ndarray) -> str:
+        """
+        Run Tesseract on a preprocessed image
         
-        # Apply threshold to get black and white image
-        _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        Uses the in-process tesserocr bindings when installed. Otherwise the
+        image is piped to the tesseract command as an uncompressed BMP on
+        stdin, which skips the PIL conversion and PNG temp file pytesseract
+        would use.
+        """
+        if PyTessBaseAPI is not None:
+            api = self._get_tesseract_api()
+            api.SetImage(Image.fromarray(image))
+            return api.GetUTF8Text()
         
-        # Optional: Apply morphological operations to clean up the image
-        kernel = np.ones((1, 1), np.uint8)
-        cleaned = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+        success, encoded = cv2.imencode('.bmp', image)
+        if not success:
+            raise ValueError("Could not encode image for OCR")
         
-        return cleaned
+        command = [pytesseract.pytesseract.tesseract_cmd, 'stdin', 'stdout', *shlex.split(self.tesseract_config)]
+        result = subprocess.run(command, input=encoded.tobytes(), capture_output=True, check=True)
+        return result.stdout.decode('utf-8')
+    
+    def _get_tesseract_api(self) -> "PyTessBaseAPI":
+        """Get this thread's tesserocr API, creating it with the TESSERACT_CONFIG options on first use"""
+        api = getattr(self._tesseract_local, 'api', None)
+        if api is None:
+            modes = {option: int(value) for option, value in _TESSERACT_MODE_RE.findall(self.tesseract_config)}
+            api = PyTessBaseAPI(**modes)
+            for name, value in _TESSERACT_VARIABLE_RE.findall(self.tesseract_config):
+                api.SetVariable(name, value)
+            self._tesseract_local.api = api
+        return api
     
     def _parse_contacts_from_text(self, text: str) -> List[Dict[str, str]]:
         """
@@ -94,10 +325,30 @@ class ContactExtractor:
         +1 234 567 8901
         """
         contacts = []
-        lines = text.strip().split('\n')
+        seen_phones = set()
+        
+        # Clean lines and remove empty ones, stripping each line only once
+        lines = [line for line in map(str.strip, text.split('\n')) if line]
         
-        # Clean lines and remove empty ones
-        lines = [line.strip() for line in lines if line.strip()]
+        # Classify every line once; the scans below look at each line several times
+        phones = [self._extract_phone_number(line) for line in lines]
+        is_name = [phone is None and self._looks_like_name(line) for line, phone in zip(lines, phones)]
+        
+        # Index of the nearest phone line after each line and the nearest name line
+        # before it, so the pairing windows below are single lookups
+        next_phone = [None] * len(lines)
+        upcoming = None
+        for k in range(len(lines) - 1, -1, -1):
+            next_phone[k] = upcoming
+            if phones[k]:
+                upcoming = k
+        
+        prev_name = [None] * len(lines)
+        latest = None
+        for k in range(len(lines)):
+            prev_name[k] = latest
+            if is_name[k]:
+                latest = k
         
         # Simple approach: go through lines and pair each name with the next phone number
         i = 0
@@ -105,44 +356,42 @@ class ContactExtractor:
             current_line = lines[i]
             
             # If current line is a name
-            if self._is_likely_name(current_line):
+            if is_name[i]:
                 name = self._clean_name(current_line)
                 
                 # Look for phone number in the next few lines
                 phone = None
-                for j in range(i + 1, min(i + 5, len(lines))):
-                    potential_phone = self._extract_phone_number(lines[j])
-                    if potential_phone:
-                        phone = potential_phone
-                        i = j  # Skip to the phone number line
-                        break
+                j = next_phone[i]
+                if j is not None and j < i + 5:
+                    phone = phones[j]
+                    i = j  # Skip to the phone number line
                 
                 if name and phone:
                     contacts.append({
                         'name': name,
                         'phone': phone
                     })
+                    seen_phones.add(phone)
                     logger.debug(f"Found contact: {name} - {phone}")
             
             # If current line is a phone number but we haven't paired it yet
-            elif self._extract_phone_number(current_line):
-                phone = self._extract_phone_number(current_line)
+            elif phones[i]:
+                phone = phones[i]
                 
                 # Look backwards for a name
                 name = None
-                for j in range(i - 1, max(i - 5, -1), -1):
-                    if self._is_likely_name(lines[j]):
-                        name = self._clean_name(lines[j])
-                        break
+                j = prev_name[i]
+                if j is not None and j > i - 5:
+                    name = self._clean_name(lines[j])
                 
                 if name and phone:
                     # Check if we already have this contact (avoid duplicates)
-                    existing = any(c['phone'] == phone for c in contacts)
-                    if not existing:
+                    if phone not in seen_phones:
                         contacts.append({
                             'name': name,
                             'phone': phone
                         })
+                        seen_phones.add(phone)
                         logger.debug(f"Found contact (backward search): {name} - {phone}")
             
             i += 1
@@ -151,14 +400,18 @@ class ContactExtractor:
     
     def _is_likely_name(self, line: str) -> bool:
         """Determine if a line is likely a contact name"""
-        # Remove extensive OCR artifacts and prefixes
-        clean_line = re.sub(r'^[QS\$\@\#\-g\-é«\*D\.\(\)\©\"\']*\s*[~•\-\s]*', '', line).strip()
-        clean_line = re.sub(r'[;GH\\KN°\.UxXY:]*$', '', clean_line).strip()
-        
         # Check if it's not a phone number
         if self._extract_phone_number(line):
             return False
         
+        return self._looks_like_name(line)
+    
+    def _looks_like_name(self, line: str) -> bool:
+        """Name checks of _is_likely_name, for a line already known not to be a phone number"""
+        # Remove extensive OCR artifacts and prefixes
+        clean_line = _NAME_PREFIX_RE.sub('', line).strip()
+        clean_line = _NAME_SUFFIX_RE.sub('', clean_line).strip()
+        
         # Check if it has reasonable name characteristics
         if len(clean_line) < 2 or len(clean_line) > 50:
             return False
@@ -169,33 +422,25 @@ class ContactExtractor:
             
         # Should contain mostly letters and common name characters
         # Be more lenient for OCR corruption
-        name_pattern = re.compile(r'^[a-zA-Z\s\.\-\'\(\)0-9]+$')
-        if bool(name_pattern.match(clean_line)):
+        if _NAME_ALLOWED_RE.match(clean_line):
             return True
             
-        # Additional check for common name patterns
-        if any(char.isalpha() for char in clean_line) and len(clean_line) >= 2:
-            # Count letters vs non-letters
-            letters = sum(1 for char in clean_line if char.isalpha())
-            total = len(clean_line)
-            if letters / total >= 0.5:  # At least 50% letters
-                return True
-            
-        return False
+        # Additional check for common name patterns: count letters vs non-letters
+        # (clean_line has at least 2 characters here)
+        letters = sum(map(str.isalpha, clean_line))
+        return letters / len(clean_line) >= 0.5  # At least 50% letters
     
     def _clean_name(self, line: str) -> str:
         """Clean and format a name"""
         # Remove extensive OCR artifacts and common prefixes
-        name = re.sub(r'^[QS\$\@\#\-g\-é«\*D\.\(\)\©\"\'bd]*\s*[~•\-\s]*', '', line).strip()
+        name = _CLEAN_PREFIX_RE.sub('', line).strip()
         
         # Remove trailing symbols and artifacts
-        name = re.sub(r'[;GH\\KN°\.UxXY:\*]*$', '', name).strip()
-        
-        # Remove remaining non-letter characters except spaces, dots, apostrophes
-        name = re.sub(r'[^a-zA-Z\s\.\'\-]', ' ', name)
+        name = _CLEAN_SUFFIX_RE.sub('', name).strip()
         
-        # Clean up extra spaces
-        name = re.sub(r'\s+', ' ', name).strip()
+        # Turn remaining non-letter characters except dots, apostrophes and hyphens
+        # into spaces, and clean up extra spaces
+        name = ' '.join(name.translate(_NAME_KEEP).split())
         
         # Title case
         return name.title() if name else "Unknown"
@@ -209,47 +454,32 @@ class ContactExtractor:
         (234) 567-8901
         234-567-8901
         """
-        # Remove all non-digit and non-plus characters for initial check
-        digits_only = re.sub(r'[^\d+]', '', line)
-        
-        # Must have at least 10 digits (excluding country code)
-        if len(digits_only.replace('+', '')) < 10:
+        # Must have at least 10 digits (excluding country code); counted without
+        # a regex since most lines are names and fail here
+        if sum(map(str.isdecimal, line)) < 10:
             return None
         
-        # Enhanced phone number patterns
-        patterns = [
-            # International formats
-            r'\+\d{1,3}\s*\d{5}\s*\d{5}',                             # +91 98765 43210
-            r'\+\d{1,3}\s*\d{2,5}\s*\d{2,5}\s*\d{2,5}',              # Various international formats
-            r'\+\d{1,3}[\s\-]?\(?\d{3}\)?[\s\-]?\d{3}[\s\-]?\d{4}',   # US format with country code
-            r'\+\d{1,3}[\s\-]?\d{3,5}[\s\-]?\d{3,5}[\s\-]?\d{3,5}',  # General international
-            # Domestic formats
-            r'\(?\d{3}\)?[\s\-]?\d{3}[\s\-]?\d{4}',                   # US format
-            r'\d{3}[\s\-]?\d{3}[\s\-]?\d{4}',                         # Simple format
-            # Indian specific patterns
-            r'\+91\s*\d{5}\s*\d{5}',                                  # +91 12345 67890
-            r'\+91\s*\d{2}\s*\d{4}\s*\d{4}',                         # +91 98 7654 3210
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, line)
-            if match:
-                phone = match.group(0)
-                # Clean up the phone number
-                phone = re.sub(r'[\s\-\(\)]', '', phone)
-                return phone
-        
-        return None
+        # International patterns all need a '+', so skip them on lines without one
+        match = None
+        if '+' in line:
+            for pattern in _INTERNATIONAL_PHONE_PATTERNS:
+                match = pattern.search(line)
+                if match:
+                    break
+        
+        if not match:
+            match = _DOMESTIC_PHONE_RE.search(line)
+        
+        # Clean up the phone number
+        return _PHONE_STRIP_RE.sub('', match.group(0)) if match else None
     
     def save_contacts_to_file(self, contacts: List[Dict[str, str]], output_path: str) -> bool:
         """Save extracted contacts to a file"""
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write("# Extracted Contacts\n")
-                f.write("# Format: Name | Phone Number\n\n")
-                
-                for contact in contacts:
-                    f.write(f"{contact['name']} | {contact['phone']}\n")
+            lines = ["# Extracted Contacts\n", "# Format: Name | Phone Number\n\n"]
+            lines.extend(f"{contact['name']} | {contact['phone']}\n" for contact in contacts)
+            
+            Path(output_path).write_text(''.join(lines), encoding='utf-8')
             
             logger.info(f"Saved {len(contacts)} contacts to {output_path}")
             return True
@@ -262,8 +492,7 @@ class ContactExtractor:
         """Get raw OCR text for debugging purposes"""
         try:
             processed_image = self._preprocess_image(image_path)
-            text = pytesseract.image_to_string(processed_image, config=self.tesseract_config)
-            return text
+            return self._image_to_string(processed_image)
         except Exception as e:
             logger.error(f"Error in OCR preview: {str(e)}")
             return ""
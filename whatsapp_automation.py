@@ -2,36 +2,221 @@
 WhatsApp Web Automation using Selenium
 Handles login, sending messages, and session management
 """
+import os
+import re
+import json
 import time
+import queue
+import shutil
 import logging
 import random
+import tempfile
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Iterable, Iterator, Tuple
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException,
+    ElementNotInteractableException, ElementClickInterceptedException, WebDriverException,
+)
 import config
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Finds the popup button to click in a single script call. Only buttons inside a
+# visible dialog are considered (chat list rows are role="button" too, so nothing
+# outside dialogs is ever clicked), in priority order: a button labelled exactly
+# Continue (text or aria-label), a close button, then a button labelled exactly
+# with a common dismissal text. Returns [element, label] or null.
+_POPUP_JS = """
+const visible = el => el.getClientRects().length > 0 && !el.disabled;
+const text = el => (el.innerText || '').trim();
+const ariaLabel = el => (el.getAttribute('aria-label') || '').trim();
+const dialogs = "div[role='dialog'], div[class*='modal'], div[data-testid*='modal'], " +
+    "div[data-testid*='popup'], div[data-testid*='dialog'], div[class*='overlay'], " +
+    "div[class*='popup'], div[id*='modal'], div[id*='popup']";
+const popups = Array.from(document.querySelectorAll(dialogs)).filter(visible);
+const popupButtons = popups.flatMap(popup => Array.from(popup.querySelectorAll('button')).filter(visible));
+for (const el of popupButtons) {
+    if (text(el) === 'Continue' || ariaLabel(el) === 'Continue') return [el, 'Continue'];
+}
+for (const el of popupButtons) {
+    if (/[cC]lose/.test(ariaLabel(el))) return [el, 'close'];
+}
+for (const label of ['OK', 'Got it', 'Accept', 'Allow', 'Enable', 'Dismiss', 'Skip']) {
+    for (const el of popupButtons) {
+        if (text(el) === label) return [el, label];
+    }
+}
+return null;
+"""
+
+# Sets the search box text (arguments[0], arguments[1]) and fires the input event WhatsApp listens to
+_SET_SEARCH_JS = """
+const box = arguments[0], text = arguments[1];
+box.focus();
+box.innerText = text;
+box.dispatchEvent(new InputEvent('input', {bubbles: true, data: text, inputType: 'insertText'}));
+"""
+
+# Replaces the message box content (arguments[0]) with the message (arguments[1]) as
+# typed text; line breaks and characters outside the BMP (emoji) are kept
+_TYPE_MESSAGE_JS = """
+arguments[0].focus();
+document.execCommand('selectAll', false, null);
+document.execCommand('insertText', false, arguments[1]);
+"""
+
+# Whether WhatsApp rejected the number of a send?phone= link
+_INVALID_NUMBER_JS = "return document.body.innerText.includes('shared via url is invalid');"
+
+# send_message_to_contact failures (last_failure) that may succeed when tried again; all
+# happen before Enter is pressed, so a retry never sends a message a second time
+_TRANSIENT_FAILURES = {'chat_not_opened', 'typing_failed', 'error'}
+
+# WebDriver errors from a page that was still loading or changing; trying again may work
+_TRANSIENT_ERRORS = (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException,
+    ElementNotInteractableException, ElementClickInterceptedException,
+)
+
+# Error messages of a browser or server that is being rate limited
+_RATE_LIMIT_RE = re.compile(r'\b429\b|too many requests|rate.?limit', re.IGNORECASE)
+
+# Start of the log line for a send outcome, by success
+_OUTCOME_TEXT = {True: "✓ Message sent to", False: "✗ Failed to send message to"}
+
+# Everything but digits, dropped from phone numbers for WhatsApp URLs and duplicate tracking
+_NON_DIGIT_RE = re.compile(r'\D')
+
+# Serialize appends to the sent numbers file and the send log from pooled sessions
+_sent_file_lock = threading.Lock()
+_send_log_lock = threading.Lock()
+
+def _normalize_phone(phone_number: str) -> str:
+    """Digits-only form of a phone number, so differently formatted copies compare equal"""
+    return _NON_DIGIT_RE.sub('', phone_number)
+
+def _load_sent_numbers() -> Set[str]:
+    """Load phone numbers recorded by earlier runs (empty unless SENT_NUMBERS_FILE is set)"""
+    path = config.SENT_NUMBERS_FILE
+    if not path or not Path(path).exists():
+        return set()
+    return {_normalize_phone(line) for line in Path(path).read_text(encoding='utf-8').splitlines() if line}
+
+def _record_sent_number(phone_number: str):
+    """Append a sent phone number to SENT_NUMBERS_FILE so a restarted run skips it"""
+    if not config.SENT_NUMBERS_FILE:
+        return
+    with _sent_file_lock, open(config.SENT_NUMBERS_FILE, 'a', encoding='utf-8') as f:
+        f.write(phone_number + '\n')
+
+# Single thread that writes debug screenshots to disk, one at a time
+_screenshot_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot-writer")
+# Sequence number in default screenshot names, so shots taken within one second don't collide
+_screenshot_numbers = itertools.count(1)
+
+def _write_screenshot(path: Path, png: bytes):
+    """Write a captured screenshot to disk (runs on the screenshot writer thread)"""
+    try:
+        path.write_bytes(png)
+        logger.info(f"Screenshot saved: {path}")
+    except Exception as e:
+        logger.error(f"Error saving screenshot {path}: {str(e)}")
+
+def _log_send_result(phone_number: str, contact_name: str, success: bool, failure: Optional[str]):
+    """Append one send outcome to config.SEND_LOG_FILE as a JSON line (if configured)"""
+    if not config.SEND_LOG_FILE:
+        return
+    record = {'time': time.time(), 'phone': phone_number, 'name': contact_name, 'ok': success, 'failure': failure}
+    try:
+        config.ensure_dirs()
+        with _send_log_lock, open(config.SEND_LOG_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except Exception as e:
+        logger.error(f"Error writing send log: {str(e)}")
+
+def _save_progress(results: Dict[str, bool]):
+    """
+    Write the send results so far to config.PROGRESS_FILE
+    
+    Written to a temporary file and renamed into place, so a crash never
+    leaves a half-written file behind.
+    """
+    try:
+        config.ensure_dirs()
+        tmp_path = config.PROGRESS_FILE.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(results, ensure_ascii=False, indent=1), encoding='utf-8')
+        os.replace(tmp_path, config.PROGRESS_FILE)
+    except Exception as e:
+        logger.error(f"Error saving send progress: {str(e)}")
+
+def _is_transient(error: WebDriverException) -> bool:
+    """Whether a WebDriver error is likely temporary, so the send is worth retrying"""
+    return isinstance(error, _TRANSIENT_ERRORS) or bool(_RATE_LIMIT_RE.search(str(error)))
+
+def _collect_results(outcomes: Iterable[Tuple[str, bool]]) -> Dict[str, bool]:
+    """
+    Gather (contact name, success) pairs into a dict, checkpointing it to disk along the way
+    
+    The results so far are also saved when sending ends with an exception.
+    """
+    results = {}
+    checkpoint_every = config.PROGRESS_CHECKPOINT_INTERVAL
+    try:
+        for count, (contact_name, success) in enumerate(outcomes, 1):
+            results[contact_name] = success
+            if count % checkpoint_every == 0:
+                _save_progress(results)
+    finally:
+        _save_progress(results)
+    return results
+
+def _pending_contacts(contacts: List[Dict[str, str]], sent_numbers: Set[str],
+                      results: Dict[str, bool]) -> List[Dict[str, str]]:
+    """
+    Drop contacts whose number was already sent to, or appears earlier in the list
+    
+    Skipped contacts are recorded as failed in results, so the send loop only
+    sees (and waits between) contacts that really get a message.
+    """
+    pending = []
+    seen = set()
+    for contact in contacts:
+        phone_key = _normalize_phone(contact['phone'])
+        if phone_key in sent_numbers or phone_key in seen:
+            logger.warning(f"🚨 DUPLICATE PREVENTION: Already sent message to {contact['phone']} ({contact['name']}) - SKIPPING!")
+            results[contact['name']] = False
+            continue
+        seen.add(phone_key)
+        pending.append(contact)
+    
+    return pending
+
 class WhatsAppAutomation:
     """WhatsApp Web automation using Selenium"""
     
-    def __init__(self, headless: bool = config.HEADLESS_MODE, profile_path: Optional[str] = config.CHROME_PROFILE_PATH):
+    def __init__(self, headless: bool = config.HEADLESS_MODE, profile_path: Optional[str] = config.CHROME_PROFILE_PATH,
+                 debugger_address: Optional[str] = config.CHROME_DEBUGGER_ADDRESS):
         self.driver = None
         self.wait = None
+        self.fast_wait = None
         self.headless = headless
         self.profile_path = profile_path
+        self.debugger_address = debugger_address
         self.is_logged_in = False
         self.popups_handled = False  # Add flag to track popup handling
-        self.sent_numbers = set()  # Track sent phone numbers to prevent duplicates
+        self.sent_numbers: Set[str] = _load_sent_numbers()  # Track sent phone numbers to prevent duplicates
+        self.last_failure = None  # Why the last send_message_to_contact failed (None if it did not)
+        self._stop = threading.Event()  # Set by request_stop() to end a batch early
         
         # WhatsApp Web selectors (these may change if WhatsApp updates their UI)
         self.selectors = {
@@ -45,8 +230,11 @@ class WhatsAppAutomation:
             'loading_screen': 'div[data-testid="startup"]',
             'message_info': 'span[data-icon="msg-time"]',
             'side_panel': 'div[id="side"]',
-            'main_panel': 'div[id="main"]'
+            'main_panel': 'div[id="main"]',
+            'search_result': 'div[role="listitem"]'
         }
+        # Ready-made (By, selector) locators for the above, built once per session
+        self._locators = {name: (By.CSS_SELECTOR, selector) for name, selector in self.selectors.items()}
         
         # Multiple QR code selectors for fallback
         self.qr_selectors = [
@@ -66,12 +254,32 @@ class WhatsAppAutomation:
             'div[class*="app-wrapper-web"]', # App wrapper
             'div:has(div[title="New chat"])', # Contains new chat button
         ]
+        
+        # Additional elements that indicate an existing login
+        self.login_indicators = [
+            'div[title="New chat"]',           # New chat button
+            'div[data-testid="search"]',       # Search box
+            'div[class*="app-wrapper-web"]',   # Main app wrapper
+            'span[data-icon="chat"]',          # Chat icons
+            'div:contains("Search or start a new chat")',  # Search placeholder
+        ]
+        
+        # Each list as one grouped CSS query, so a check is a single find_elements call.
+        # ':contains' is not CSS (it would invalidate the whole group), so it is left out
+        self._qr_selector_union = ", ".join(s for s in self.qr_selectors if ':contains' not in s)
+        self._login_selector_union = ", ".join(self.login_selectors)
+        self._login_indicator_union = ", ".join(
+            s for s in self.login_selectors + self.login_indicators if ':contains' not in s
+        )
     
     def setup_driver(self) -> bool:
         """Setup Chrome WebDriver with appropriate options"""
         try:
             chrome_options = Options()
             
+            # Return from navigation once the DOM is ready; every page step waits for its own element
+            chrome_options.page_load_strategy = 'eager'
+            
             # Basic options
             chrome_options.add_argument("--no-sandbox")
             chrome_options.add_argument("--disable-dev-shm-usage")
@@ -114,16 +322,32 @@ class WhatsAppAutomation:
             if self.headless:
                 chrome_options.add_argument("--headless")
             
-            # Setup ChromeDriver
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            # Attach to an already running Chrome instead: launch options do not apply to it
+            if self.debugger_address:
+                logger.info(f"Attaching to Chrome at {self.debugger_address}")
+                chrome_options = Options()
+                chrome_options.page_load_strategy = 'eager'
+                chrome_options.add_experimental_option("debuggerAddress", self.debugger_address)
+            
+            # Start Chrome; Selenium Manager finds (and caches) a matching ChromeDriver
+            self.driver = webdriver.Chrome(options=chrome_options)
+            
+            # Block media downloads (profile pictures, emoji, previews) that the image pref misses
+            if config.BLOCKED_URL_PATTERNS:
+                try:
+                    self.driver.execute_cdp_cmd("Network.enable", {})
+                    self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": config.BLOCKED_URL_PATTERNS})
+                except Exception as e:
+                    logger.debug(f"Could not block media URLs: {str(e)}")
             
-            # Configure timeouts
-            self.driver.implicitly_wait(config.IMPLICIT_WAIT)
+            # Configure timeouts. No implicit wait: element probes return at once
+            # when nothing matches, and waiting is done with explicit WebDriverWaits
+            self.driver.implicitly_wait(0)
             self.driver.set_page_load_timeout(config.PAGE_LOAD_TIMEOUT)
             
-            # Setup WebDriverWait
-            self.wait = WebDriverWait(self.driver, config.IMPLICIT_WAIT)
+            # Setup WebDriverWaits, polling at short intervals to continue as soon as the page is ready
+            self.wait = WebDriverWait(self.driver, config.IMPLICIT_WAIT, poll_frequency=config.UI_POLL_INTERVAL)
+            self.fast_wait = WebDriverWait(self.driver, config.UI_WAIT_TIMEOUT, poll_frequency=config.UI_POLL_INTERVAL)
             
             logger.info("Chrome WebDriver setup successfully")
             return True
@@ -144,8 +368,13 @@ class WhatsAppAutomation:
             logger.info("Navigating to WhatsApp Web...")
             self.driver.get(config.WHATSAPP_WEB_URL)
             
-            # Wait for page to load and handle any immediate popups
-            time.sleep(5)
+            # Wait for the app to render either the chat list or the QR code
+            try:
+                self.fast_wait.until(lambda driver: driver.find_elements(By.CSS_SELECTOR, 'div[id="side"], canvas'))
+            except TimeoutException:
+                logger.debug("Neither chat list nor QR code rendered yet")
+            
+            # Handle any immediate popups
             logger.info("Handling any immediate popups after page load...")
             self._handle_popups()
             
@@ -158,30 +387,15 @@ class WhatsAppAutomation:
             # Wait for QR code to appear
             logger.info("Waiting for QR code to appear...")
             
-            # Try multiple QR code selectors
+            # Wait for any of the QR code selectors, as one grouped query
             qr_code = None
-            for i, selector in enumerate(self.qr_selectors):
-                try:
-                    logger.debug(f"Trying QR selector {i+1}/{len(self.qr_selectors)}: {selector}")
-                    qr_code = self.wait.until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    logger.info(f"✅ QR code found with selector: {selector}")
-                    break
-                except TimeoutException:
-                    logger.debug(f"QR selector {i+1} failed: {selector}")
-                    if i < len(self.qr_selectors) - 1:
-                        continue
-                    else:
-                        # All selectors failed - try one more time with any canvas
-                        try:
-                            canvases = self.driver.find_elements(By.TAG_NAME, "canvas")
-                            if canvases:
-                                logger.info(f"Found {len(canvases)} canvas elements, using first one")
-                                qr_code = canvases[0]
-                                break
-                        except:
-                            pass
+            try:
+                qr_code = self.wait.until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, self._qr_selector_union))
+                )
+                logger.info("✅ QR code found")
+            except TimeoutException:
+                logger.debug(f"No QR selector matched: {self._qr_selector_union}")
             
             if qr_code:
                 logger.info("📱 QR code appeared. Please scan with your phone...")
@@ -207,35 +421,15 @@ class WhatsAppAutomation:
     def _is_already_logged_in(self) -> bool:
         """Check if already logged in using multiple selectors"""
         try:
-            # Wait a bit for page to load
-            time.sleep(3)
-            
             # Handle popups FIRST before checking login status (only if not already handled)
             if not self.popups_handled:
                 logger.info("Handling any popups before checking login status...")
                 self._handle_popups()
             
-            # Try multiple selectors to detect if already logged in
-            for selector in self.login_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    logger.debug(f"Login detected with selector: {selector}")
-                    return True
-            
-            # Additional checks for specific WhatsApp elements that indicate login
-            login_indicators = [
-                'div[title="New chat"]',           # New chat button
-                'div[data-testid="search"]',       # Search box
-                'div[class*="app-wrapper-web"]',   # Main app wrapper
-                'span[data-icon="chat"]',          # Chat icons
-                'div:contains("Search or start a new chat")',  # Search placeholder
-            ]
-            
-            for indicator in login_indicators:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, indicator)
-                if elements:
-                    logger.debug(f"Login indicator found: {indicator}")
-                    return True
+            # Check all login selectors and indicators in one query
+            if self.driver.find_elements(By.CSS_SELECTOR, self._login_indicator_union):
+                logger.debug("Login indicator found")
+                return True
             
             logger.debug("No login indicators found - not logged in")
             return False
@@ -251,34 +445,24 @@ class WhatsAppAutomation:
         
         while time.time() - start_time < config.QR_SCAN_TIMEOUT:
             try:
-                # Try multiple selectors to detect successful login
-                login_detected = False
-                for selector in self.login_selectors:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        logger.info(f"✅ Login detected with selector: {selector}")
-                        login_detected = True
-                        break
-                
-                if login_detected:
+                # Check all login selectors in one query
+                if self.driver.find_elements(By.CSS_SELECTOR, self._login_selector_union):
+                    logger.info("✅ Login detected")
                     logger.info("🎉 Successfully logged in to WhatsApp Web!")
                     self.is_logged_in = True
-                    time.sleep(5)  # Wait longer for interface to fully load
                     
-                    # Wait for UI to stabilize after login detection
-                    time.sleep(3)
+                    # The interface is ready once the search box accepts input
+                    try:
+                        WebDriverWait(self.driver, config.IMPLICIT_WAIT, poll_frequency=config.UI_POLL_INTERVAL).until(
+                            EC.element_to_be_clickable(self._locators['search_box'])
+                        )
+                    except TimeoutException:
+                        logger.debug("Search box not ready yet, continuing")
                     
                     return True
                 
                 # Check if QR code is still visible
-                qr_code_visible = False
-                for selector in self.qr_selectors:
-                    qr_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if qr_elements:
-                        qr_code_visible = True
-                        break
-                
-                if not qr_code_visible:
+                if not self.driver.find_elements(By.CSS_SELECTOR, self._qr_selector_union):
                     # QR code disappeared but login not detected yet - keep waiting
                     logger.debug("QR code disappeared, waiting for login...")
                     time.sleep(1)
@@ -307,144 +491,33 @@ class WhatsAppAutomation:
             logger.debug("⏭️ Popups already handled, skipping...")
             return
         
-        logger.info("🚀 Starting comprehensive popup handling...")
+        logger.debug("🚀 Starting comprehensive popup handling...")
         
         # Give UI time to fully load any popups
         time.sleep(3)
         
-        # Strategy 1: XPath-based Continue button detection (most reliable)
-        continue_xpath_selectors = [
-            "//button[contains(text(), 'Continue')]",
-            "//div[@role='button'][contains(text(), 'Continue')]", 
-            "//*[contains(text(), 'Continue')]",
-            "//button[normalize-space()='Continue']",
-            "//div[normalize-space()='Continue']",
-            "//*[normalize-space()='Continue']",
-            "//button[contains(., 'Continue')]",
-            "//div[contains(., 'Continue')]",
-            "//*[contains(., 'Continue')]",
-        ]
-        
-        logger.debug("Strategy 1: Trying XPath Continue button selectors...")
-        continue_found = False
-        for i, xpath in enumerate(continue_xpath_selectors):
-            try:
-                elements = self.driver.find_elements(By.XPATH, xpath)
-                if elements:
-                    logger.info(f"✅ Found {len(elements)} Continue elements with: {xpath}")
-                    for j, elem in enumerate(elements):
-                        try:
-                            if elem.is_displayed() and elem.is_enabled():
-                                logger.info(f"🎯 Clicking Continue button {j+1}...")
-                                elem.click()
-                                logger.info("✅ Successfully clicked Continue button!")
-                                self.popups_handled = True  # Mark popups as handled
-                                time.sleep(3)
-                                continue_found = True
-                                break
-                        except Exception as e:
-                            logger.debug(f"Click attempt {j+1} failed: {str(e)}")
-                    if continue_found:
-                        break
-                else:
-                    logger.debug(f"No elements found for: {xpath}")
-            except Exception as e:
-                logger.debug(f"XPath error: {xpath} - {str(e)}")
-        
-        if continue_found:
-            logger.info("🎉 Continue button clicked successfully!")
-            time.sleep(2)
-            return
-        
-        # Strategy 2: Look for all role="button" elements
-        logger.debug("Strategy 2: Checking all role='button' elements...")
+        # Strategies 1-4: Continue, dialog close and common dismissal buttons, in one browser-side pass
+        logger.debug("Scanning page for popup buttons...")
         try:
-            button_roles = self.driver.find_elements(By.XPATH, "//*[@role='button']")
-            logger.debug(f"Found {len(button_roles)} elements with role='button'")
-            
-            for i, elem in enumerate(button_roles):
-                try:
-                    text = elem.text.strip()
-                    aria_label = elem.get_attribute("aria-label") or ""
-                    
-                    if ("Continue" in text or "Continue" in aria_label) and elem.is_displayed():
-                        logger.info(f"🎯 Found Continue in role=button: '{text}' / '{aria_label}'")
-                        elem.click()
-                        logger.info("✅ Clicked role=button Continue!")
-                        self.popups_handled = True  # Mark popups as handled
-                        time.sleep(3)
-                        return
-                        
-                except Exception as e:
-                    logger.debug(f"Error checking button {i+1}: {str(e)}")
+            found = self.driver.execute_script(_POPUP_JS)
+            if found:
+                button, kind = found
+                logger.debug("🎯 Found popup button: %s", kind)
+                button.click()
+                logger.debug("✅ Clicked %s button!", kind)
+                if kind == 'Continue':
+                    self.popups_handled = True  # Mark popups as handled
+                time.sleep(2)
+                return
         except Exception as e:
-            logger.debug(f"Error getting role=button elements: {str(e)}")
-        
-        # Strategy 3: Look for common popup patterns
-        logger.debug("Strategy 3: Checking common popup patterns...")
-        popup_patterns = [
-            # Modal dialogs
-            "div[role='dialog']",
-            "div[class*='modal']",
-            "div[data-testid*='modal']",
-            "div[data-testid*='popup']",
-            "div[data-testid*='dialog']",
-            # Overlay patterns
-            "div[class*='overlay']",
-            "div[class*='popup']",
-            "div[id*='modal']",
-            "div[id*='popup']",
-        ]
-        
-        for pattern in popup_patterns:
-            try:
-                popups = self.driver.find_elements(By.CSS_SELECTOR, pattern)
-                for popup in popups:
-                    if popup.is_displayed():
-                        # Look for Continue buttons within this popup
-                        continue_buttons = popup.find_elements(By.XPATH, ".//button[contains(text(), 'Continue')]")
-                        if continue_buttons:
-                            logger.info(f"🎯 Found Continue in popup pattern: {pattern}")
-                            continue_buttons[0].click()
-                            logger.info("✅ Clicked popup Continue button!")
-                            self.popups_handled = True  # Mark popups as handled
-                            time.sleep(3)
-                            return
-                        
-                        # Look for other close buttons
-                        close_buttons = popup.find_elements(By.XPATH, ".//button[contains(@aria-label, 'close') or contains(@aria-label, 'Close')]")
-                        if close_buttons:
-                            logger.info(f"🎯 Found close button in popup: {pattern}")
-                            close_buttons[0].click()
-                            logger.info("✅ Clicked close button!")
-                            time.sleep(2)
-                            return
-            except Exception as e:
-                logger.debug(f"Error checking popup pattern {pattern}: {str(e)}")
-        
-        # Strategy 4: Look for any buttons with specific text patterns
-        logger.debug("Strategy 4: Checking buttons with common text patterns...")
-        button_texts = ["Continue", "OK", "Got it", "Accept", "Allow", "Enable", "Dismiss", "Skip"]
-        
-        for button_text in button_texts:
-            try:
-                buttons = self.driver.find_elements(By.XPATH, f"//button[contains(text(), '{button_text}')]")
-                for button in buttons:
-                    if button.is_displayed() and button.is_enabled():
-                        logger.info(f"🎯 Found button with text: {button_text}")
-                        button.click()
-                        logger.info(f"✅ Clicked {button_text} button!")
-                        time.sleep(2)
-                        return
-            except Exception as e:
-                logger.debug(f"Error checking button text {button_text}: {str(e)}")
+            logger.debug("Error scanning for popup buttons: %s", e)
         
         # Strategy 5: Handle browser alerts
         logger.debug("Strategy 5: Checking for browser alerts...")
         try:
             alert = self.driver.switch_to.alert
             alert.accept()
-            logger.info("✅ Handled browser alert!")
+            logger.debug("✅ Handled browser alert!")
             time.sleep(2)
             return
         except:
@@ -458,11 +531,11 @@ class WhatsAppAutomation:
             logger.debug("Pressed Escape key")
             time.sleep(2)
         except Exception as e:
-            logger.debug(f"Error pressing Escape: {str(e)}")
+            logger.debug("Error pressing Escape: %s", e)
         
         # Final verification
         time.sleep(2)
-        logger.info("🏁 Popup handling completed")
+        logger.debug("🏁 Popup handling completed")
         
         # Verify page is still responsive
         try:
@@ -474,11 +547,9 @@ class WhatsAppAutomation:
     def _check_browser_alive(self) -> bool:
         """Check if the browser is still alive and responsive"""
         try:
-            # Try to get the current URL - this will fail if browser is crashed
-            self.driver.current_url
-            
-            # Try to find the body element - this will fail if page is not loaded
-            self.driver.find_element(By.TAG_NAME, "body")
+            # One script call fails if the browser or tab has crashed; the page must also have a body
+            if not self.driver.execute_script("return document.body !== null"):
+                raise WebDriverException("page has no body element")
             
             return True
             
@@ -494,23 +565,42 @@ class WhatsAppAutomation:
                 return False
             
             # Clean phone number (remove + and spaces)
-            clean_phone = phone_number.replace("+", "").replace(" ", "").replace("-", "")
-            logger.debug(f"Searching for contact by phone: {phone_number} ({contact_name if contact_name else 'Unknown'})")
+            clean_phone = _normalize_phone(phone_number)
+            logger.debug("Searching for contact by phone: %s (%s)", phone_number, contact_name or 'Unknown')
             
             # ROBUST APPROACH: Use direct URL method first (more reliable)
-            logger.debug(f"Using direct URL approach for {clean_phone}")
+            logger.debug("Using direct URL approach for %s", clean_phone)
             chat_url = f"https://web.whatsapp.com/send?phone={clean_phone}"
             self.driver.get(chat_url)
-            time.sleep(5)
             
-            # Wait for chat to load
-            time.sleep(3)
+            # Wait for chat to load: it is open once the message box is usable
+            try:
+                self.fast_wait.until(
+                    EC.element_to_be_clickable(self._locators['message_box'])
+                )
+                logger.debug("Successfully opened chat for %s (%s)", phone_number, contact_name or 'Unknown')
+                return True
+            except TimeoutException:
+                # A number that is not on WhatsApp gets an error dialog instead; no fallback will help
+                if self.driver.execute_script(_INVALID_NUMBER_JS):
+                    logger.warning(f"Phone number {phone_number} is not on WhatsApp")
+                    self.last_failure = 'invalid_number'
+                    return False
             
-            # Verify chat is open by checking for message box
-            message_box = self.driver.find_elements(By.CSS_SELECTOR, self.selectors['message_box'])
-            if message_box:
-                logger.debug(f"Successfully opened chat for {phone_number} ({contact_name if contact_name else 'Unknown'})")
+            # A popup may be covering the chat: dismiss it and load the chat URL again, so the
+            # message box found is the one of this number's chat (dismissing may open another chat)
+            logger.debug("Chat not ready, checking for popups...")
+            self.popups_handled = False
+            self._handle_popups()
+            self.driver.get(chat_url)
+            try:
+                self.fast_wait.until(
+                    EC.element_to_be_clickable(self._locators['message_box'])
+                )
+                logger.debug("Opened chat for %s after handling popups", phone_number)
                 return True
+            except TimeoutException:
+                pass
             
             # FALLBACK: Try search method if direct URL failed
             logger.debug("Direct URL failed, trying search method")
@@ -518,35 +608,39 @@ class WhatsAppAutomation:
             # Navigate back to main WhatsApp page if needed
             if "send?phone=" in self.driver.current_url:
                 self.driver.get(config.WHATSAPP_WEB_URL)
-                time.sleep(3)
             
-            # Click on search box
+            # Find the search box
             search_box = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, self.selectors['search_box']))
+                EC.element_to_be_clickable(self._locators['search_box'])
             )
-            search_box.click()
-            time.sleep(1)
             
-            # ROBUST CLEARING: Select all and delete, then clear
-            search_box.send_keys(Keys.CONTROL + "a")  # Select all
-            search_box.send_keys(Keys.DELETE)          # Delete selected text
-            search_box.clear()                         # Clear again for safety
-            time.sleep(1)
+            def first_result(driver):
+                results = driver.find_elements(*self._locators['search_result'])
+                return [results[0].text] if results else []
+            
+            # Replace the search text in one call; the input event makes WhatsApp run the search
+            results_before = first_result(self.driver)
+            self.driver.execute_script(_SET_SEARCH_JS, search_box, clean_phone)
             
-            # Type the phone number
-            search_box.send_keys(clean_phone)
-            time.sleep(3)  # Wait for search results
+            # Wait for search results
+            try:
+                WebDriverWait(self.driver, 5, poll_frequency=config.UI_POLL_INTERVAL).until(
+                    lambda driver: first_result(driver) not in ([], results_before)
+                )
+            except TimeoutException:
+                logger.debug("Search results did not change, selecting first result anyway")
             
             # Press Enter to select first result
             search_box.send_keys(Keys.ENTER)
-            time.sleep(3)
             
             # Verify chat opened
-            message_box = self.driver.find_elements(By.CSS_SELECTOR, self.selectors['message_box'])
-            if message_box:
-                logger.debug(f"Successfully opened chat for {phone_number} via search")
+            try:
+                self.fast_wait.until(
+                    EC.element_to_be_clickable(self._locators['message_box'])
+                )
+                logger.debug("Successfully opened chat for %s via search", phone_number)
                 return True
-            else:
+            except TimeoutException:
                 logger.warning(f"Both methods failed for {phone_number}")
                 return False
                     
@@ -554,8 +648,10 @@ class WhatsAppAutomation:
             logger.warning(f"Contact with phone '{phone_number}' not found")
             return False
             
-        except Exception as e:
+        except WebDriverException as e:
             logger.error(f"Error searching for contact {phone_number}: {str(e)}")
+            if not _is_transient(e):
+                self.last_failure = 'webdriver_error'
             
             # If error contains connection issues, it might be a popup causing browser crash
             if "connection" in str(e).lower() or "refused" in str(e).lower():
@@ -563,13 +659,21 @@ class WhatsAppAutomation:
                 logger.warning("💡 Trying to recover by handling any remaining popups...")
                 try:
                     self._handle_popups()
-                except:
-                    pass
+                except WebDriverException as popup_error:
+                    logger.debug(f"Popup recovery failed: {str(popup_error)}")
             
             return False
     
     def send_message(self, message: str) -> bool:
-        """Send a message in the currently open chat"""
+        """
+        Send a message in the currently open chat
+        
+        Once Enter has been pressed the message counts as sent, even if WhatsApp
+        is slow to confirm it, so that it is never sent to the chat twice. When
+        the message could not be typed, last_failure is set to 'typing_failed'
+        (or 'webdriver_error' if the error does not look temporary). Errors
+        that are not WebDriver errors are raised.
+        """
         try:
             if not self.is_logged_in:
                 logger.error("Not logged in to WhatsApp")
@@ -577,39 +681,45 @@ class WhatsAppAutomation:
             
             # Find message input box
             message_box = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, self.selectors['message_box']))
+                EC.element_to_be_clickable(self._locators['message_box'])
             )
             
-            # Click on message box and send message
-            message_box.click()
-            message_box.clear()
-            
-            # Handle multi-line messages
-            lines = message.split('\n')
-            for i, line in enumerate(lines):
-                message_box.send_keys(line)
-                if i < len(lines) - 1:  # Not the last line
-                    message_box.send_keys(Keys.SHIFT + Keys.ENTER)
+            # Replace the box content with the whole (multi-line) message in one call
+            self.driver.execute_script(_TYPE_MESSAGE_JS, message_box, message)
             
+        except WebDriverException as e:
+            logger.error(f"Error typing message: {str(e)}")
+            self.last_failure = 'typing_failed' if _is_transient(e) else 'webdriver_error'
+            return False
+        
+        try:
             # Send the message
             message_box.send_keys(Keys.ENTER)
             
-            # Wait a moment to ensure message is sent
-            time.sleep(1)
-            
-            logger.debug("Message sent successfully")
-            return True
-            
-        except Exception as e:
+        except WebDriverException as e:
             logger.error(f"Error sending message: {str(e)}")
             return False
+        
+        try:
+            # WhatsApp empties the input once it has taken the message
+            self.fast_wait.until(lambda driver: not message_box.text.strip())
+            logger.debug("Message sent successfully")
+            
+        except WebDriverException:
+            # Enter went out, so whatever the check ran into, the message is not sent again
+            logger.warning("Message sent, but WhatsApp did not confirm it in time")
+        
+        return True
     
     def send_message_to_contact(self, phone_number: str, contact_name: str, message: str) -> bool:
         """Send a message to a specific contact using phone number"""
+        self.last_failure = None
         try:
             # DUPLICATE PREVENTION: Check if we already sent to this number
-            if phone_number in self.sent_numbers:
+            phone_key = _normalize_phone(phone_number)
+            if phone_key in self.sent_numbers:
                 logger.warning(f"🚨 DUPLICATE PREVENTION: Already sent message to {phone_number} ({contact_name}) - SKIPPING!")
+                self.last_failure = 'duplicate'
                 return False
             
             logger.info(f"Sending message to {phone_number} ({contact_name})")
@@ -617,45 +727,85 @@ class WhatsAppAutomation:
             # Check if browser is still alive before starting
             if not self._check_browser_alive():
                 logger.error("Browser has crashed or closed unexpectedly")
+                self.last_failure = 'browser_crashed'
                 return False
             
-            # Handle any popups that might have appeared - be more thorough
-            logger.debug("🔧 Pre-contact popup check...")
-            self._handle_popups()
-            
             # Search and open contact by phone number
             if not self.search_and_open_contact_by_phone(phone_number, contact_name):
                 logger.error(f"Failed to open chat with {phone_number} ({contact_name})")
+                self.last_failure = self.last_failure or 'chat_not_opened'
                 return False
             
             # Check again after opening chat
             if not self._check_browser_alive():
                 logger.error("Browser crashed after opening chat")
+                self.last_failure = 'browser_crashed'
                 return False
             
             # Send message
             if not self.send_message(message):
                 logger.error(f"Failed to send message to {phone_number} ({contact_name})")
+                self.last_failure = self.last_failure or 'send_failed'
                 return False
             
             logger.info(f"Successfully sent message to {phone_number} ({contact_name})")
             
             # TRACK SENT NUMBER: Add to sent numbers set to prevent duplicates
-            self.sent_numbers.add(phone_number)
-            logger.debug(f"📝 Added {phone_number} to sent numbers tracking (total: {len(self.sent_numbers)})")
+            self.sent_numbers.add(phone_key)
+            _record_sent_number(phone_key)
+            logger.debug("📝 Added %s to sent numbers tracking (total: %d)", phone_number, len(self.sent_numbers))
+            
+            # Periodically look for warning dialogs WhatsApp shows during long sessions
+            if len(self.sent_numbers) % config.POPUP_RECHECK_INTERVAL == 0:
+                logger.debug("🔧 Periodic popup check...")
+                self.popups_handled = False
+                self._handle_popups()
             
             return True
             
-        except Exception as e:
+        except WebDriverException as e:
             logger.error(f"Error sending message to {phone_number} ({contact_name}): {str(e)}")
             
             # Check if it was a browser crash
+            self.last_failure = 'error' if _is_transient(e) else 'webdriver_error'
             if not self._check_browser_alive():
                 logger.error("🚨 Browser crashed during message sending - automation stopped")
                 logger.error("💡 Try restarting the automation")
+                self.last_failure = 'browser_crashed'
             
             return False
     
+    def send_message_with_retry(self, phone_number: str, contact_name: str, message: str) -> bool:
+        """
+        Send a message to a contact, retrying failures that may be temporary
+        
+        A chat that did not load or a message that could not be typed is retried
+        up to config.SEND_RETRIES times, with exponentially growing pauses (plus
+        up to a second of jitter). Nothing is retried once Enter was pressed, as
+        that may send the message twice. Numbers that are not on WhatsApp,
+        duplicates, browser crashes and WebDriver errors that do not look
+        temporary are not retried either. A request_stop() during the pause
+        before a retry ends it at once, without retrying.
+        
+        Returns:
+            True if the message was sent
+        """
+        retries = config.SEND_RETRIES
+        for attempt in range(retries + 1):
+            if self.send_message_to_contact(phone_number, contact_name, message):
+                return True
+            
+            if attempt == retries or self.last_failure not in _TRANSIENT_FAILURES:
+                return False
+            
+            pause = min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * 2 ** attempt) + random.uniform(0, 1)
+            logger.info("Retrying %s (%s) in %.0f seconds (%s)...", phone_number, contact_name, pause, self.last_failure)
+            if self._stop.wait(pause):
+                logger.info("Sending stopped, not retrying %s (%s)", phone_number, contact_name)
+                return False
+        
+        return False
+    
     def send_messages_to_contacts(self, contacts: List[Dict[str, str]], message_template: str) -> Dict[str, bool]:
         """
         Send messages to multiple contacts with rate limiting
@@ -667,47 +817,70 @@ class WhatsAppAutomation:
         Returns:
             Dictionary with contact names as keys and success status as values
         """
-        results = {}
+        return _collect_results(self.iter_send_messages(contacts, message_template))
+    
+    def request_stop(self):
+        """Stop sending once the message being sent now is done (safe to call from any thread)"""
+        self._stop.set()
+    
+    def iter_send_messages(self, contacts: List[Dict[str, str]], message_template: str) -> Iterator[Tuple[str, bool]]:
+        """
+        Send messages to multiple contacts with rate limiting, yielding each result as it comes
         
-        for i, contact in enumerate(contacts):
+        Lets callers handle (e.g. write out) results while sending, instead of
+        holding all of them until the end.
+        
+        Args:
+            contacts: List of contact dictionaries with 'name' and 'phone' keys
+            message_template: Message template (same message sent to all contacts)
+            
+        Yields:
+            (contact name, success) pairs, skipped duplicates first; contacts
+            not attempted because of request_stop() are left out
+        """
+        self._stop.clear()
+        skipped = {}
+        contacts = _pending_contacts(contacts, self.sent_numbers, skipped)
+        yield from skipped.items()
+        
+        pacer = SendPacer()
+        total = len(contacts)
+        
+        for number, contact in enumerate(contacts, 1):
             contact_name = contact['name']
             phone_number = contact['phone']
+            success = False
             
             try:
-                # Use the same message for all contacts (no personalization)
-                personalized_message = message_template
-                
-                # Send message using phone number
-                success = self.send_message_to_contact(phone_number, contact_name, personalized_message)
-                results[contact_name] = success
-                
-                if success:
-                    logger.info(f"✓ Message sent to {phone_number} ({contact_name}) ({i+1}/{len(contacts)})")
-                else:
-                    logger.error(f"✗ Failed to send message to {phone_number} ({contact_name}) ({i+1}/{len(contacts)})")
+                # Rate limiting: wait until the delay since the previous send's start is over
+                if not pacer.wait(self._stop):
+                    logger.warning("Sending stopped, %d/%d contacts not attempted", total - number + 1, total)
+                    break
                 
-                # Rate limiting (except for last message)
-                if i < len(contacts) - 1:
-                    delay = random.randint(config.MIN_DELAY_BETWEEN_MESSAGES, config.MAX_DELAY_BETWEEN_MESSAGES)
-                    logger.info(f"Waiting {delay} seconds before next message...")
-                    time.sleep(delay)
+                # Send message using phone number (the same message for all contacts, no personalization)
+                success = self.send_message_with_retry(phone_number, contact_name, message_template)
+                pacer.record(success)
+                _log_send_result(phone_number, contact_name, success, self.last_failure)
+                logger.log(logging.INFO if success else logging.ERROR, "%s %s (%s) (%d/%d)",
+                           _OUTCOME_TEXT[success], phone_number, contact_name, number, total)
                 
-            except Exception as e:
+            except WebDriverException as e:
                 logger.error(f"Error processing contact {contact_name}: {str(e)}")
-                results[contact_name] = False
-        
-        return results
+            
+            yield contact_name, success
     
     def take_screenshot(self, filename: str = None) -> str:
         """Take a screenshot for debugging"""
         try:
             if not filename:
                 timestamp = int(time.time())
-                filename = f"whatsapp_screenshot_{timestamp}.png"
+                filename = f"whatsapp_screenshot_{timestamp}_{next(_screenshot_numbers)}.png"
             
+            config.ensure_dirs()
             screenshot_path = config.LOGS_DIR / filename
-            self.driver.save_screenshot(str(screenshot_path))
-            logger.info(f"Screenshot saved: {screenshot_path}")
+            
+            # Capture now; the file is written in the background so sending is not held up
+            _screenshot_writer.submit(_write_screenshot, screenshot_path, self.driver.get_screenshot_as_png())
             return str(screenshot_path)
             
         except Exception as e:
@@ -717,7 +890,7 @@ class WhatsAppAutomation:
     def get_current_chat_info(self) -> Optional[str]:
         """Get information about the currently open chat"""
         try:
-            chat_header = self.driver.find_elements(By.CSS_SELECTOR, self.selectors['chat_header'])
+            chat_header = self.driver.find_elements(*self._locators['chat_header'])
             if chat_header:
                 return chat_header[0].text
             return None
@@ -737,6 +910,7 @@ class WhatsAppAutomation:
         finally:
             self.driver = None
             self.wait = None
+            self.fast_wait = None
             self.is_logged_in = False
             # Reset session tracking
             self.sent_numbers.clear()
@@ -746,10 +920,12 @@ class WhatsAppAutomation:
         """Reset the sent numbers tracking (useful for testing or new sessions)"""
         old_count = len(self.sent_numbers)
         self.sent_numbers.clear()
+        if config.SENT_NUMBERS_FILE and Path(config.SENT_NUMBERS_FILE).exists():
+            Path(config.SENT_NUMBERS_FILE).write_text('', encoding='utf-8')
         logger.info(f"🔄 Reset sent numbers tracking (previously tracked: {old_count} numbers)")
     
     def get_sent_numbers(self):
-        """Get the list of phone numbers that have been sent messages"""
+        """Get the list of phone numbers (digits only) that have been sent messages"""
         return list(self.sent_numbers)
     
     def __enter__(self):
@@ -760,11 +936,303 @@ class WhatsAppAutomation:
         """Context manager exit"""
         self.close()
 
+class SendPacer:
+    """
+    Spaces out message sends, also when several threads send at once
+    
+    Delays adapt to how sending goes: each failure doubles them (up to
+    config.MAX_SEND_BACKOFF times the configured range) and each success
+    takes back half of the configured range, so after trouble the pace
+    returns to normal gradually, but never gets faster than configured.
+    """
+    
+    def __init__(self, min_delay: float = config.MIN_DELAY_BETWEEN_MESSAGES,
+                 max_delay: float = config.MAX_DELAY_BETWEEN_MESSAGES, seed: Optional[int] = config.SEND_DELAY_SEED):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.backoff = 1.0  # Multiplier on the configured delays
+        self._rng = random.Random(seed)  # Own generator, so a seed gives a reproducible delay sequence
+        self._next_start = None  # Earliest time.monotonic() the next send may start
+        self._lock = threading.Lock()
+    
+    def next_delay(self) -> float:
+        """Pick the delay between two sends"""
+        return self._rng.uniform(self.min_delay, self.max_delay) * self.backoff
+    
+    def record(self, success: bool):
+        """Adjust the pace to the outcome of a send"""
+        with self._lock:
+            if success:
+                self.backoff = max(1.0, self.backoff - 0.5)
+            else:
+                self.backoff = min(config.MAX_SEND_BACKOFF, self.backoff * 2)
+    
+    def wait(self, stop: Optional[threading.Event] = None) -> bool:
+        """
+        Block until the caller may start its send
+        
+        Every call reserves the next start time, a random delay after the
+        previously reserved one, so waiting threads are released one by one
+        instead of in bursts. The first send starts at once.
+        
+        Args:
+            stop: Event that ends the wait early when set
+            
+        Returns:
+            True if the send may start, False if stop was set
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = now if self._next_start is None else max(now, self._next_start)
+            self._next_start = start + self.next_delay()
+        
+        if start > now:
+            logger.info("Waiting %.0f seconds before next message...", start - now)
+            if stop is None:
+                time.sleep(start - now)
+            else:
+                stop.wait(start - now)
+        
+        return stop is None or not stop.is_set()
+
+class WhatsAppDriverPool:
+    """Several WhatsApp Web sessions sending messages in parallel"""
+    
+    def __init__(self, size: int = config.MAX_CONCURRENT_SENDS, headless: bool = config.HEADLESS_MODE,
+                 profile_path: Optional[str] = config.CHROME_PROFILE_PATH):
+        self.size = size
+        self.headless = headless
+        self.profile_path = profile_path
+        self.sessions = []
+        self._idle = queue.Queue()  # Logged-in sessions not currently sending (None once all are gone)
+        self._sessions_lock = threading.Lock()
+        self._sends = {}  # Sends per session since its browser was (re)started
+        self._profile_copies = []
+        self._pacer = None  # Spaces out sends across sessions during a batch
+        self._stop = threading.Event()  # Set by request_stop() to end the batch early
+        
+        # Duplicate prevention shared by all sessions
+        self.sent_numbers: Set[str] = _load_sent_numbers()
+        self._sent_lock = threading.Lock()
+    
+    def start(self) -> bool:
+        """
+        Open and log in all sessions
+        
+        With a Chrome profile configured, each session gets its own copy of it
+        (Chrome locks a profile directory to a single browser), so a profile
+        that is already logged in to WhatsApp Web logs in every session.
+        Without one, each session shows its own QR code to scan.
+        
+        Returns:
+            True if at least one session logged in
+        """
+        for index in range(self.size):
+            session = self._new_session(index)
+            if session.login_to_whatsapp():
+                self.sessions.append(session)
+                self._idle.put(session)
+            else:
+                logger.error(f"Failed to login browser session {index + 1}/{self.size}")
+                session.close()
+        
+        logger.info(f"{len(self.sessions)}/{self.size} browser sessions ready")
+        return bool(self.sessions)
+    
+    def _new_session(self, index: int) -> WhatsAppAutomation:
+        """Create a session, with its own copy of the Chrome profile if one is configured"""
+        profile_copy = None
+        if self.profile_path:
+            profile_copy = tempfile.mkdtemp(prefix=f"whatsapp_profile_{index}_")
+            shutil.copytree(self.profile_path, profile_copy, dirs_exist_ok=True)
+            self._profile_copies.append(profile_copy)
+        
+        # WhatsApp Web is active in only one tab per browser, so every session launches its own
+        session = WhatsAppAutomation(headless=self.headless, profile_path=profile_copy, debugger_address=None)
+        session._stop = self._stop  # The pool's request_stop() also cuts short a session's retry pause
+        return session
+    
+    def send_messages_to_contacts(self, contacts: List[Dict[str, str]], message_template: str) -> Dict[str, bool]:
+        """
+        Send messages to multiple contacts, spread over the pooled sessions
+        
+        Args:
+            contacts: List of contact dictionaries with 'name' and 'phone' keys
+            message_template: Message template (same message sent to all contacts)
+            
+        Returns:
+            Dictionary with contact names as keys and success status as values
+        """
+        return _collect_results(self.iter_send_messages(contacts, message_template))
+    
+    def iter_send_messages(self, contacts: List[Dict[str, str]], message_template: str) -> Iterator[Tuple[str, bool]]:
+        """
+        Send messages over the pooled sessions, yielding each result in contact order
+        
+        Args:
+            contacts: List of contact dictionaries with 'name' and 'phone' keys
+            message_template: Message template (same message sent to all contacts)
+            
+        Yields:
+            (contact name, success) pairs, skipped duplicates first; contacts
+            not attempted because of request_stop() are left out
+        """
+        self._stop.clear()
+        skipped = {}
+        contacts = _pending_contacts(contacts, self.sent_numbers, skipped)
+        yield from skipped.items()
+        
+        # One pacer for all sessions: n sessions together send as often as n serial senders
+        # would, but evenly spread, and the time spent sending counts toward each delay
+        sessions = len(self.sessions) or 1
+        self._pacer = SendPacer(config.MIN_DELAY_BETWEEN_MESSAGES / sessions,
+                                config.MAX_DELAY_BETWEEN_MESSAGES / sessions)
+        
+        with ThreadPoolExecutor(max_workers=sessions) as executor:
+            outcomes = executor.map(lambda contact: self._send_one(contact, message_template), contacts)
+            not_attempted = 0
+            try:
+                for contact, success in zip(contacts, outcomes):
+                    if success is None:
+                        not_attempted += 1
+                    else:
+                        yield contact['name'], success
+            finally:
+                # If the batch ends early (an error, or the caller stopped reading),
+                # the contacts still queued are dropped instead of sent
+                self._stop.set()
+        
+        if not_attempted:
+            logger.warning("Sending stopped, %d/%d contacts not attempted", not_attempted, len(contacts))
+    
+    def request_stop(self):
+        """Stop sending once the messages being sent now are done (safe to call from any thread)"""
+        self._stop.set()
+    
+    def _send_one(self, contact: Dict[str, str], message: str) -> Optional[bool]:
+        """
+        Send one message from the next free session, once the pacer allows it
+        
+        Returns:
+            Whether the message was sent, or None if sending was stopped first
+            (or no session is left to send it)
+        """
+        if self._stop.is_set():
+            return None
+        
+        contact_name = contact['name']
+        phone_number = contact['phone']
+        phone_key = _normalize_phone(phone_number)
+        
+        # Reserve the number so no other session sends to it at the same time
+        with self._sent_lock:
+            if phone_key in self.sent_numbers:
+                logger.warning(f"🚨 DUPLICATE PREVENTION: Already sent message to {phone_number} ({contact_name}) - SKIPPING!")
+                return False
+            self.sent_numbers.add(phone_key)
+        
+        session = self._idle.get()
+        try:
+            if session is None or not self._pacer.wait(self._stop):
+                with self._sent_lock:
+                    self.sent_numbers.discard(phone_key)
+                return None
+            
+            success = session.send_message_with_retry(phone_number, contact_name, message)
+            self._pacer.record(success)
+            _log_send_result(phone_number, contact_name, success, session.last_failure)
+            logger.log(logging.INFO if success else logging.ERROR, "%s %s (%s)",
+                       _OUTCOME_TEXT[success], phone_number, contact_name)
+            
+            if not success:
+                with self._sent_lock:
+                    self.sent_numbers.discard(phone_key)
+            
+            # Replace a session whose browser died, or that has sent its share of messages
+            self._sends[session] = self._sends.get(session, 0) + 1
+            if not success and not session._check_browser_alive():
+                session = self._restart_session(session, "crashed")
+            elif (config.MAX_SENDS_PER_SESSION and session.profile_path
+                  and self._sends[session] >= config.MAX_SENDS_PER_SESSION):
+                session = self._restart_session(session, "recycling")
+            
+            return success
+            
+        except WebDriverException as e:
+            logger.error(f"Error processing contact {contact_name}: {str(e)}")
+            with self._sent_lock:
+                self.sent_numbers.discard(phone_key)
+            return False
+        
+        except Exception:
+            # Not a browser problem: release the number and end the batch with the error
+            with self._sent_lock:
+                self.sent_numbers.discard(phone_key)
+            raise
+        
+        finally:
+            if session is not None:
+                self._idle.put(session)
+            elif not self.sessions:
+                # Wake the next thread waiting for a session; it finds none and passes this on
+                self._idle.put(None)
+    
+    def _restart_session(self, session: WhatsAppAutomation, reason: str) -> Optional[WhatsAppAutomation]:
+        """
+        Quit a session's browser and log it in again
+        
+        A session that fails to log in is dropped from the pool. Once none are
+        left, the batch stops: the contacts not sent yet are not attempted.
+        
+        Returns:
+            The session, or None if it was dropped
+        """
+        logger.warning(f"🔄 Restarting browser session ({reason})...")
+        session.close()
+        if session.login_to_whatsapp():
+            self._sends.pop(session, None)
+            return session
+        
+        logger.error("Failed to restart browser session, removing it from the pool")
+        session.close()
+        with self._sessions_lock:
+            self.sessions.remove(session)
+            self._sends.pop(session, None)
+            sessions_left = len(self.sessions)
+        
+        if not sessions_left:
+            logger.error("🚨 No browser sessions left - stopping")
+            self._stop.set()
+        return None
+    
+    def close(self):
+        """Close all sessions and remove their profile copies"""
+        for session in self.sessions:
+            session.close()
+        self.sessions = []
+        self._idle = queue.Queue()
+        self._sends = {}
+        
+        for profile_copy in self._profile_copies:
+            shutil.rmtree(profile_copy, ignore_errors=True)
+        self._profile_copies = []
+    
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.close()
+
 def main():
     """Test the WhatsApp automation"""
     # Setup logging for testing
     logging.basicConfig(level=logging.INFO, format=config.LOG_FORMAT)
     
+    # Ask before starting the browser, so the session does not sit idle at the prompt
+    test_contact = input("Enter a contact name to test: ").strip()
+    
     # Test the automation
     with WhatsAppAutomation(headless=False) as wa:
         print("Setting up WhatsApp automation...")
@@ -773,11 +1241,10 @@ def main():
             print("Successfully logged in!")
             
             # Test sending a message
-            test_contact = input("Enter a contact name to test: ").strip()
             if test_contact:
                 test_message = "This is a test message from the automation script!"
                 
-                if wa.send_message_to_contact("+1234567890", test_contact, test_message):
+                if wa.send_message_with_retry("+1234567890", test_contact, test_message):
                     print("Test message sent successfully!")
                 else:
                     print("Failed to send test message")